@@ -0,0 +1,625 @@
+from collections import OrderedDict
+from hashlib import sha256
+import mmap
+import os
+import threading
+
+class FixedBaseTable:
+    # Affine multiples of a fixed base point stored as 64-byte big-endian
+    # x || y records. Entry (window, digit) is digit * 2^(window * width) * G
+    # for digit in 1 .. 2^width - 1. The buffer may be a read-only mmap of a
+    # saved table, in which case records are only parsed when looked up.
+    # Saved tables start with SHA-256(tag || records), where the tag names the
+    # curve and width, so a stale or corrupted file is rejected on load.
+    RECORD_SIZE = 64
+    DIGEST_SIZE = 32
+
+    def __init__(self, buffer, width):
+        self.buffer = buffer
+        self.width = width
+        self.digits = (1 << width) - 1
+        self.windows = len(buffer) // (self.digits * self.RECORD_SIZE)
+        if len(buffer) != self.windows * self.digits * self.RECORD_SIZE:
+            raise ValueError('table size does not match the window width')
+
+    def __getitem__(self, index):
+        window, digit = index
+        offset = (window * self.digits + digit - 1) * self.RECORD_SIZE
+        return (int.from_bytes(self.buffer[offset:offset + 32], 'big'),
+                int.from_bytes(self.buffer[offset + 32:offset + 64], 'big'))
+
+    def save(self, path, tag):
+        tmp_path = f'{path}.tmp{os.getpid()}'
+        with open(tmp_path, 'wb') as f:
+            f.write(sha256(tag + self.buffer).digest())
+            f.write(self.buffer)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, width, tag):
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(mapped)[cls.DIGEST_SIZE:]
+        digest = sha256(tag)
+        digest.update(buffer)
+        if digest.digest() != mapped[:cls.DIGEST_SIZE]:
+            raise ValueError('table digest does not match its contents')
+        return cls(buffer, width)
+
+
+class ECElGamal:
+    # Elliptic Curve Parameters for secp256k1
+    P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+    A = 0
+    B = 7
+    Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+    Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+    N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+    G = (Gx, Gy)
+
+    # k*G uses a process-wide FixedBaseTable of 4-bit windows, built on first
+    # use. If FIXED_BASE_TABLE_PATH is set the table is memory-mapped from
+    # that file, which is written the first time it is built.
+    FIXED_BASE_WIDTH = 4
+    FIXED_BASE_TABLE_PATH = os.environ.get('ECELGAMAL_TABLE_PATH')
+    _fixed_base_table = None
+    _fixed_base_lock = threading.Lock()
+
+    # Variable-base multiplication uses width-5 NAF over the odd multiples
+    # P, 3P, ..., 15P of the base point. The multiples of reused points such
+    # as a recipient's public key are kept in a process-wide LRU cache.
+    WNAF_WIDTH = 5
+    WNAF_CACHE_SIZE = 64
+    _wnaf_cache = OrderedDict()
+    _wnaf_lock = threading.Lock()
+
+    # GLV endomorphism: (x, y) -> (BETA * x, y) equals multiplication by
+    # LAMBDA, so k * P = k1 * P + k2 * (LAMBDA * P) with k1, k2 of about 128
+    # bits found from a short lattice basis (a1, b1), (a2, b2) of the kernel
+    # of (i, j) -> i + j * LAMBDA mod N
+    BETA = 0x7AE96A2B657C07106E64479EAC3434E99CF0497512F58995C1396C28719501EE
+    LAMBDA = 0x5363AD4CC05C30E0A5261C028812645A122E22EA20816678DF02967C1B23BD72
+    GLV_A1 = 0x3086D221A7D46BCDE86C90E49284EB15
+    GLV_B1 = -0xE4437ED6010E88286F547FA90ABFE4C3
+    GLV_A2 = 0x114CA50F7A8E2F3F657C1108D9D44CFD8
+    GLV_B2 = 0x3086D221A7D46BCDE86C90E49284EB15
+    GLV_BITS = 129
+
+    # encrypt/decrypt run payloads through the KDF stream in pieces of this
+    # size, so the keystream for a large payload is never held all at once
+    PAYLOAD_CHUNK_SIZE = 1 << 16
+
+    def __init__(self):
+        self.private_key, self.public_key = self.generate_keys()
+
+    def generate_keys(self):
+        private_key = int.from_bytes(os.urandom(32), 'big') % self.N
+        public_key = self.base_multiply(private_key)
+        return private_key, public_key
+
+    def inverse_mod(self, k, p):
+        if k == 0:
+            raise ZeroDivisionError('division by zero')
+        if k < 0:
+            return p - self.inverse_mod(-k, p)
+        s, old_s = 0, 1
+        t, old_t = 1, 0
+        r, old_r = p, k
+        while r != 0:
+            quotient = old_r // r
+            old_r, r = r, old_r - quotient * r
+            old_s, s = s, old_s - quotient * s
+            old_t, t = t, old_t - quotient * t
+        return old_s % p
+
+    def point_add(self, point1, point2):
+        if point1 == (None, None):
+            return point2
+        if point2 == (None, None):
+            return point1
+
+        x1, y1 = point1
+        x2, y2 = point2
+
+        if x1 == x2 and y1 != y2:
+            return (None, None)
+
+        if x1 == x2:
+            m = (3 * x1 * x1) * self.inverse_mod(2 * y1, self.P)
+        else:
+            m = (y2 - y1) * self.inverse_mod(x2 - x1, self.P)
+
+        x3 = m * m - x1 - x2
+        y3 = y1 + m * (x3 - x1)
+        x3 = x3 % self.P
+        y3 = -y3 % self.P
+        return (x3, y3)
+
+    # Jacobian coordinates (X, Y, Z) represent the affine point (X/Z^2, Y/Z^3)
+    # and Z == 0 is the point at infinity. Additions and doublings need no
+    # modular inversion, so a whole scalar multiplication needs only the one
+    # inversion in _to_affine.
+    INFINITY = (1, 1, 0)
+
+    def _to_jacobian(self, point):
+        if point == (None, None):
+            return self.INFINITY
+        return (point[0], point[1], 1)
+
+    def _to_affine(self, jpoint):
+        X, Y, Z = jpoint
+        if Z == 0:
+            return (None, None)
+        z_inv = self.inverse_mod(Z, self.P)
+        z_inv2 = z_inv * z_inv % self.P
+        return (X * z_inv2 % self.P, Y * z_inv2 * z_inv % self.P)
+
+    def _jacobian_double(self, jpoint):
+        # dbl-2009-l, valid for curves with a = 0 such as secp256k1
+        X1, Y1, Z1 = jpoint
+        if Z1 == 0 or Y1 == 0:
+            return self.INFINITY
+        p = self.P
+        A = X1 * X1 % p
+        B = Y1 * Y1 % p
+        C = B * B % p
+        D = 2 * ((X1 + B) * (X1 + B) - A - C) % p
+        E = 3 * A
+        F = E * E % p
+        X3 = (F - 2 * D) % p
+        Y3 = (E * (D - X3) - 8 * C) % p
+        Z3 = 2 * Y1 * Z1 % p
+        return (X3, Y3, Z3)
+
+    def _jacobian_add_affine(self, jpoint, point):
+        # madd-2007-bl: Jacobian + affine point
+        if point == (None, None):
+            return jpoint
+        X1, Y1, Z1 = jpoint
+        if Z1 == 0:
+            return (point[0], point[1], 1)
+        p = self.P
+        x2, y2 = point
+        Z1Z1 = Z1 * Z1 % p
+        U2 = x2 * Z1Z1 % p
+        S2 = y2 * Z1 * Z1Z1 % p
+        H = (U2 - X1) % p
+        r = 2 * (S2 - Y1) % p
+        if H == 0:
+            if r == 0:
+                return self._jacobian_double(jpoint)
+            return self.INFINITY
+        HH = H * H % p
+        I = 4 * HH % p
+        J = H * I % p
+        V = X1 * I % p
+        X3 = (r * r - J - 2 * V) % p
+        Y3 = (r * (V - X3) - 2 * Y1 * J) % p
+        Z3 = ((Z1 + H) * (Z1 + H) - Z1Z1 - HH) % p
+        return (X3, Y3, Z3)
+
+    def _jacobian_add(self, jpoint1, jpoint2):
+        # add-2007-bl: Jacobian + Jacobian
+        X1, Y1, Z1 = jpoint1
+        X2, Y2, Z2 = jpoint2
+        if Z1 == 0:
+            return jpoint2
+        if Z2 == 0:
+            return jpoint1
+        p = self.P
+        Z1Z1 = Z1 * Z1 % p
+        Z2Z2 = Z2 * Z2 % p
+        U1 = X1 * Z2Z2 % p
+        U2 = X2 * Z1Z1 % p
+        S1 = Y1 * Z2 * Z2Z2 % p
+        S2 = Y2 * Z1 * Z1Z1 % p
+        H = (U2 - U1) % p
+        r = 2 * (S2 - S1) % p
+        if H == 0:
+            if r == 0:
+                return self._jacobian_double(jpoint1)
+            return self.INFINITY
+        I = 4 * H * H % p
+        J = H * I % p
+        V = U1 * I % p
+        X3 = (r * r - J - 2 * V) % p
+        Y3 = (r * (V - X3) - 2 * S1 * J) % p
+        Z3 = ((Z1 + Z2) * (Z1 + Z2) - Z1Z1 - Z2Z2) * H % p
+        return (X3, Y3, Z3)
+
+    def _point_multiply_jacobian(self, scalar, point):
+        # Left-to-right double-and-add with the affine point as the addend
+        result = self.INFINITY
+        if point == (None, None):
+            return result
+        for bit in bin(scalar)[2:]:
+            result = self._jacobian_double(result)
+            if bit == '1':
+                result = self._jacobian_add_affine(result, point)
+        return result
+
+    def _batch_to_affine(self, jpoints):
+        # Montgomery's trick: invert the product of all Z coordinates once and
+        # recover each 1/Z from the prefix products
+        p = self.P
+        prefixes = []
+        product = 1
+        for X, Y, Z in jpoints:
+            prefixes.append(product)
+            if Z:
+                product = product * Z % p
+        inverse = self.inverse_mod(product, p)
+        points = [None] * len(jpoints)
+        for i in reversed(range(len(jpoints))):
+            X, Y, Z = jpoints[i]
+            if Z == 0:
+                points[i] = (None, None)
+                continue
+            z_inv = inverse * prefixes[i] % p
+            inverse = inverse * Z % p
+            z_inv2 = z_inv * z_inv % p
+            points[i] = (X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+        return points
+
+    def _glv_split(self, scalar):
+        # k = k1 + k2 * LAMBDA (mod N) with |k1|, |k2| < 2^GLV_BITS
+        n = self.N
+        c1 = (2 * self.GLV_B2 * scalar + n) // (2 * n)
+        c2 = (-2 * self.GLV_B1 * scalar + n) // (2 * n)
+        k1 = scalar - c1 * self.GLV_A1 - c2 * self.GLV_A2
+        k2 = -c1 * self.GLV_B1 - c2 * self.GLV_B2
+        return k1, k2
+
+    def _endomorphism(self, points, negate=False):
+        # LAMBDA * P for each affine point, optionally negated
+        p = self.P
+        return [(self.BETA * x % p, p - y if negate else y) for x, y in points]
+
+    def _build_fixed_base_table(self):
+        # Only GLV_BITS bits are needed: the LAMBDA * G half of a GLV split
+        # reads the same entries through the endomorphism
+        width = self.FIXED_BASE_WIDTH
+        jpoints = []
+        base = self._to_jacobian(self.G)
+        for _ in range(-(-self.GLV_BITS // width)):
+            multiple = base
+            jpoints.append(multiple)
+            for _ in range((1 << width) - 2):
+                multiple = self._jacobian_add(multiple, base)
+                jpoints.append(multiple)
+            base = self._jacobian_add(multiple, base)
+        buffer = b''.join(x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
+                          for x, y in self._batch_to_affine(jpoints))
+        return FixedBaseTable(buffer, width)
+
+    def _fixed_base_tag(self):
+        # Identifies what a saved table holds: the curve, base point and width
+        fields = (self.P, self.A, self.B, self.Gx, self.Gy, self.N, self.FIXED_BASE_WIDTH)
+        return b'FixedBaseTable' + b''.join(field.to_bytes(32, 'big') for field in fields)
+
+    def _load_fixed_base_table(self):
+        path = self.FIXED_BASE_TABLE_PATH
+        tag = self._fixed_base_tag()
+        if path and os.path.exists(path):
+            try:
+                table = FixedBaseTable.load(path, self.FIXED_BASE_WIDTH, tag)
+                if table.windows * table.width >= self.GLV_BITS and table[0, 1] == self.G:
+                    return table
+            except (OSError, ValueError):
+                pass
+        table = self._build_fixed_base_table()
+        if path:
+            try:
+                table.save(path, tag)
+            except OSError:
+                pass
+        return table
+
+    def fixed_base_table(self):
+        table = ECElGamal._fixed_base_table
+        if table is None:
+            with ECElGamal._fixed_base_lock:
+                table = ECElGamal._fixed_base_table
+                if table is None:
+                    table = ECElGamal._fixed_base_table = self._load_fixed_base_table()
+        return table
+
+    def _base_multiply_jacobian(self, scalar):
+        # One mixed addition per nonzero window digit of each GLV half
+        table = self.fixed_base_table()
+        width = table.width
+        mask = (1 << width) - 1
+        p = self.P
+        result = self.INFINITY
+        for half, scalar in enumerate(self._glv_split(scalar % self.N)):
+            negate = scalar < 0
+            scalar = abs(scalar)
+            window = 0
+            while scalar:
+                digit = scalar & mask
+                if digit:
+                    x, y = table[window, digit]
+                    if half:
+                        x = self.BETA * x % p
+                    result = self._jacobian_add_affine(result, (x, p - y if negate else y))
+                scalar >>= width
+                window += 1
+        return result
+
+    def base_multiply(self, scalar):
+        return self._to_affine(self._base_multiply_jacobian(scalar))
+
+    def _wnaf(self, scalar, width):
+        # Signed digits, least significant first; nonzero digits are odd,
+        # below 2^(width-1) in absolute value and at least width apart
+        modulus = 1 << width
+        digits = []
+        while scalar:
+            digit = 0
+            if scalar & 1:
+                digit = scalar & (modulus - 1)
+                if digit >= modulus >> 1:
+                    digit -= modulus
+                scalar -= digit
+            digits.append(digit)
+            scalar >>= 1
+        return digits
+
+    def _odd_multiples(self, point, count):
+        jpoint = self._to_jacobian(point)
+        double = self._jacobian_double(jpoint)
+        multiples = [jpoint]
+        for _ in range(count - 1):
+            multiples.append(self._jacobian_add(multiples[-1], double))
+        return self._batch_to_affine(multiples)
+
+    def wnaf_precompute(self, point, cache=True):
+        count = 1 << (self.WNAF_WIDTH - 2)
+        if not cache or not self.WNAF_CACHE_SIZE:
+            return self._odd_multiples(point, count)
+        with ECElGamal._wnaf_lock:
+            multiples = ECElGamal._wnaf_cache.get(point)
+            if multiples is not None:
+                ECElGamal._wnaf_cache.move_to_end(point)
+                return multiples
+        multiples = self._odd_multiples(point, count)
+        with ECElGamal._wnaf_lock:
+            ECElGamal._wnaf_cache[point] = multiples
+            while len(ECElGamal._wnaf_cache) > self.WNAF_CACHE_SIZE:
+                ECElGamal._wnaf_cache.popitem(last=False)
+        return multiples
+
+    def _multi_multiply_jacobian(self, terms):
+        # Shamir's trick: sum of k_i * P_i for (k_i, odd multiples of P_i)
+        # pairs with one shared chain of doublings over the interleaved wNAF
+        # digits of every scalar
+        p = self.P
+        expansions = [(self._wnaf(scalar, self.WNAF_WIDTH), multiples) for scalar, multiples in terms]
+        result = self.INFINITY
+        for i in reversed(range(max(len(digits) for digits, multiples in expansions))):
+            result = self._jacobian_double(result)
+            for digits, multiples in expansions:
+                digit = digits[i] if i < len(digits) else 0
+                if digit > 0:
+                    result = self._jacobian_add_affine(result, multiples[digit >> 1])
+                elif digit < 0:
+                    x, y = multiples[-digit >> 1]
+                    result = self._jacobian_add_affine(result, (x, p - y))
+        return result
+
+    def _point_multiply_wnaf_jacobian(self, scalar, point, cache=True):
+        # GLV split into two half-length scalars evaluated together, so about
+        # half the doublings of a full-length wNAF. The multiples of LAMBDA * P
+        # come from those of P through the endomorphism.
+        scalar %= self.N
+        if scalar == 0 or point == (None, None):
+            return self.INFINITY
+        multiples = self.wnaf_precompute(point, cache)
+        k1, k2 = self._glv_split(scalar)
+        if k1 < 0:
+            multiples1 = [(x, self.P - y) for x, y in multiples]
+        else:
+            multiples1 = multiples
+        multiples2 = self._endomorphism(multiples, negate=k2 < 0)
+        return self._multi_multiply_jacobian([(abs(k1), multiples1), (abs(k2), multiples2)])
+
+    def point_multiply_wnaf(self, scalar, point, cache=True):
+        return self._to_affine(self._point_multiply_wnaf_jacobian(scalar, point, cache))
+
+    def point_multiply(self, scalar, point):
+        if scalar <= 0:
+            return (None, None)
+        return self._to_affine(self._point_multiply_jacobian(scalar, point))
+
+    def point_multiply_affine(self, scalar, point):
+        # Reference affine double-and-add, one inversion per group operation
+        result = (None, None)
+        addend = point
+
+        while scalar:
+            if scalar & 1:
+                result = self.point_add(result, addend)
+            addend = self.point_add(addend, addend)
+            scalar >>= 1
+
+        return result
+
+    def _kdf_blocks(self, shared_secret_x, start, count):
+        # SHA-256(x || counter) for counter in start .. start + count - 1. The
+        # hash state after x is computed once and copied for every block.
+        if start + count > 1 << 32:
+            raise ValueError('message too long for the KDF counter')
+        prefix = sha256(shared_secret_x.to_bytes(32, 'big'))
+        blocks = []
+        for counter in range(start, start + count):
+            block = prefix.copy()
+            block.update(counter.to_bytes(4, 'big'))
+            blocks.append(block.digest())
+        return b"".join(blocks)
+
+    def key_derivation(self, shared_secret_x, length):
+        # Derive a key of the necessary length using SHA-256
+        return self._kdf_blocks(shared_secret_x, 0, -(-length // 32))[:length]
+
+    @staticmethod
+    def _xor(data, key):
+        # XOR as one big-integer operation instead of byte by byte
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(key[:len(data)], 'big')).to_bytes(len(data), 'big')
+
+    def _keystream_xor(self, shared_secret_x, chunks):
+        # XOR an iterable of byte strings with the KDF stream, continuing the
+        # stream across chunk boundaries so the result does not depend on
+        # how the payload was split
+        position = 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+            first = position // 32
+            last = -(-(position + len(chunk)) // 32)
+            key = self._kdf_blocks(shared_secret_x, first, last - first)
+            skip = position - first * 32
+            yield self._xor(chunk, key[skip:skip + len(chunk)])
+            position += len(chunk)
+
+    def _payload_chunks(self, data):
+        view = memoryview(data)
+        for offset in range(0, len(view), self.PAYLOAD_CHUNK_SIZE):
+            yield view[offset:offset + self.PAYLOAD_CHUNK_SIZE]
+
+    def encrypt(self, recipient_public_key, message):
+        ephemeral_public_key, ciphertext = self.encrypt_stream(recipient_public_key, self._payload_chunks(message))
+        return ephemeral_public_key, b"".join(ciphertext)
+
+    def decrypt(self, recipient_private_key, ephemeral_public_key, ciphertext):
+        return b"".join(self.decrypt_stream(recipient_private_key, ephemeral_public_key, self._payload_chunks(ciphertext)))
+
+    def encrypt_stream(self, recipient_public_key, chunks):
+        # Hybrid mode for payloads of any length: returns the ephemeral public
+        # key and a generator of ciphertext chunks, one per input chunk
+        ephemeral_private_key = int.from_bytes(os.urandom(32), 'big') % self.N
+        ephemeral_public_key = self.base_multiply(ephemeral_private_key)
+        shared_secret = self.point_multiply_wnaf(ephemeral_private_key, recipient_public_key)
+        return ephemeral_public_key, self._keystream_xor(shared_secret[0], chunks)
+
+    def decrypt_stream(self, recipient_private_key, ephemeral_public_key, chunks):
+        # Ephemeral keys are used once, so their multiples are not cached
+        shared_secret = self.point_multiply_wnaf(recipient_private_key, ephemeral_public_key, cache=False)
+        return self._keystream_xor(shared_secret[0], chunks)
+
+    def _xor_fields(self, shared_secret_x, fields):
+        # Fields wrapped under one shared secret take consecutive slices of a
+        # single KDF stream so that no keystream byte is used twice
+        key = self.key_derivation(shared_secret_x, sum(len(field) for field in fields))
+        result = []
+        offset = 0
+        for field in fields:
+            result.append(self._xor(field, key[offset:offset + len(field)]))
+            offset += len(field)
+        return result
+
+    def encrypt_many(self, items):
+        # items: (recipient_public_key, message) pairs. A message that is a list
+        # or tuple of byte strings is wrapped field by field under a single
+        # ephemeral key. All ephemeral keys and shared secrets are normalized
+        # to affine coordinates together with one modular inversion.
+        items = list(items)
+        jpoints = []
+        for recipient_public_key, message in items:
+            ephemeral_private_key = int.from_bytes(os.urandom(32), 'big') % self.N
+            jpoints.append(self._base_multiply_jacobian(ephemeral_private_key))
+            jpoints.append(self._point_multiply_wnaf_jacobian(ephemeral_private_key, recipient_public_key))
+        points = self._batch_to_affine(jpoints)
+
+        results = []
+        for i, (recipient_public_key, message) in enumerate(items):
+            ephemeral_public_key, shared_secret = points[2 * i], points[2 * i + 1]
+            if isinstance(message, (list, tuple)):
+                ciphertext = self._xor_fields(shared_secret[0], message)
+            else:
+                ciphertext, = self._xor_fields(shared_secret[0], [message])
+            results.append((ephemeral_public_key, ciphertext))
+        return results
+
+    def decrypt_many(self, recipient_private_key, items):
+        # items: (ephemeral_public_key, ciphertext) pairs as returned by
+        # encrypt_many, with one shared inversion for all shared secrets
+        items = list(items)
+        shared_secrets = self._batch_to_affine([
+            self._point_multiply_wnaf_jacobian(recipient_private_key, ephemeral_public_key, cache=False)
+            for ephemeral_public_key, ciphertext in items
+        ])
+
+        results = []
+        for shared_secret, (ephemeral_public_key, ciphertext) in zip(shared_secrets, items):
+            if isinstance(ciphertext, (list, tuple)):
+                results.append(self._xor_fields(shared_secret[0], ciphertext))
+            else:
+                results.append(self._xor_fields(shared_secret[0], [ciphertext])[0])
+        return results
+
+    # SEC1 point encoding: 0x02/0x03 || x for compressed points (the prefix
+    # carries the parity of y), 0x04 || x || y for uncompressed ones and a
+    # single 0x00 byte for the point at infinity
+    COORDINATE_SIZE = 32
+    COMPRESSED_POINT_SIZE = 1 + COORDINATE_SIZE
+
+    def encode_point(self, point, compressed=True):
+        if point == (None, None):
+            return b"\x00"
+        x, y = point
+        if compressed:
+            return bytes([2 + (y & 1)]) + x.to_bytes(self.COORDINATE_SIZE, 'big')
+        return b"\x04" + x.to_bytes(self.COORDINATE_SIZE, 'big') + y.to_bytes(self.COORDINATE_SIZE, 'big')
+
+    def _sqrt_mod_p(self, value):
+        # P = 3 (mod 4), so a square root is value^((P + 1) / 4); it has to be
+        # checked because non-residues give a wrong answer instead of failing
+        root = pow(value, (self.P + 1) // 4, self.P)
+        if root * root % self.P != value % self.P:
+            raise ValueError('not a quadratic residue')
+        return root
+
+    def decode_point(self, data):
+        # Accepts both encodings and rejects anything that is not on the curve
+        data = bytes(data)
+        if data == b"\x00":
+            return (None, None)
+        size = self.COORDINATE_SIZE
+        if len(data) == 1 + size and data[0] in (2, 3):
+            x = int.from_bytes(data[1:], 'big')
+            if x >= self.P:
+                raise ValueError('invalid point encoding')
+            try:
+                y = self._sqrt_mod_p((x * x * x + self.A * x + self.B) % self.P)
+            except ValueError:
+                raise ValueError('point is not on the curve') from None
+            if y & 1 != data[0] & 1:
+                y = self.P - y
+            return (x, y)
+        if len(data) == 1 + 2 * size and data[0] == 4:
+            x = int.from_bytes(data[1:1 + size], 'big')
+            y = int.from_bytes(data[1 + size:], 'big')
+            if x >= self.P or y >= self.P or (y * y - x * x * x - self.A * x - self.B) % self.P:
+                raise ValueError('point is not on the curve')
+            return (x, y)
+        raise ValueError('invalid point encoding')
+
+    # Packed ciphertext: compressed ephemeral public key followed by the
+    # payload XORed with the KDF stream, 33 bytes of overhead per recipient
+    def pack_ciphertext(self, ephemeral_public_key, ciphertext):
+        if ephemeral_public_key == (None, None):
+            raise ValueError('ephemeral public key is the point at infinity')
+        return self.encode_point(ephemeral_public_key) + bytes(ciphertext)
+
+    def unpack_ciphertext(self, data):
+        if len(data) < self.COMPRESSED_POINT_SIZE:
+            raise ValueError('packed ciphertext is too short')
+        data = memoryview(data)
+        return self.decode_point(data[:self.COMPRESSED_POINT_SIZE]), bytes(data[self.COMPRESSED_POINT_SIZE:])
+
+    def encrypt_packed(self, recipient_public_key, message):
+        return self.pack_ciphertext(*self.encrypt(recipient_public_key, message))
+
+    def decrypt_packed(self, recipient_private_key, data):
+        ephemeral_public_key, ciphertext = self.unpack_ciphertext(data)
+        return self.decrypt(recipient_private_key, ephemeral_public_key, ciphertext)
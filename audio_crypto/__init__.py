@@ -0,0 +1,49 @@
+"""
+Audio encryption with Blowfish, Rabin signatures and EC-ElGamal key wrapping.
+
+The submodules are imported on first use of a name below, so
+``import audio_crypto`` is cheap; NumPy and sounddevice are likewise only
+loaded by the code paths that need them.
+
+    python -m audio_crypto [--headless]        # Bob and Alice demo
+    python -m audio_crypto.batch --help        # batch container encryption
+"""
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    'BlowFish': 'blowfish',
+    'OFBStream': 'blowfish',
+    'OFBPrefetchStream': 'blowfish',
+    'ECElGamal': 'ElGamal',
+    'RabinSignature': 'rabin_sig',
+    'RabinPrivateKey': 'rabin_sig',
+    'MerkleTree': 'merkle',
+    'iter_chunks': 'merkle',
+    'sign_chunks': 'merkle',
+    'verify_chunks': 'merkle',
+    'ContainerReader': 'container',
+    'ContainerWriter': 'container',
+    'write_container': 'container',
+    'write_container_async': 'async_pipeline',
+    'StreamingPlayer': 'streaming',
+    'read_wave_file': 'audio',
+    'write_wave_file': 'audio',
+    'encrypt_wave_file': 'audio',
+    'decrypt_wave_file': 'audio',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
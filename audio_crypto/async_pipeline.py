@@ -0,0 +1,135 @@
+"""
+Asyncio pipeline that encrypts, signs and key-wraps a WAV file concurrently.
+
+The stages of the demo do not all depend on each other: wrapping the Blowfish
+key for the recipient needs nothing from the audio, and hashing a ciphertext
+chunk for the signature can overlap with encrypting the next ones. Here they
+run as concurrent tasks:
+
+    read frames -> encrypt (CTR) -> hash + write -> sign root, header and key
+    wrap key (EC-ElGamal) ------------------------------^
+
+connected by bounded asyncio queues, so a slow stage holds back the ones
+feeding it instead of letting chunks pile up in memory. CPU-bound work runs in
+an executor: the default thread pool overlaps the stages that release the
+GIL (NumPy XOR, hashlib), and a ProcessPoolExecutor spreads the Blowfish
+encryption of separate chunks across cores. The output is a container file
+(see container.py).
+"""
+import asyncio
+import os
+import wave
+
+from .blowfish import BlowFish
+from .container import CHUNK_FRAMES, NONCE_SIZE, ContainerWriter
+from .merkle import MerkleTree
+
+QUEUE_SIZE = 4  # Chunks in flight between two stages
+
+
+def _discard(future):
+    # Cancel a future nobody will await, or retrieve its result if it has
+    # already finished so that a failure is not reported as never retrieved
+    if not future.cancel() and not future.cancelled():
+        future.exception()
+
+
+async def write_container_async(path, wave_path, recipient_public_key, rabin_private_key, ec,
+                                blowfish_key=None, chunk_frames=CHUNK_FRAMES, executor=None,
+                                queue_size=QUEUE_SIZE):
+    """
+    Async counterpart of container.write_container. File I/O runs in the
+    event loop's default executor and CPU-bound stages in `executor` (None
+    also means the default executor).
+    """
+    loop = asyncio.get_running_loop()
+    if blowfish_key is None:
+        blowfish_key = os.urandom(16)
+    nonce = os.urandom(NONCE_SIZE)
+    cipher = BlowFish(blowfish_key)
+    signature_size = (rabin_private_key.n.bit_length() + 7) // 8
+
+    # Independent of the audio, so it starts right away
+    wrap = loop.run_in_executor(executor, ec.encrypt_many, [(recipient_public_key, [blowfish_key, nonce])])
+
+    # Encryption futures in file order; the queue bound caps how many chunks
+    # are read and encrypting ahead of the writer
+    encrypted = asyncio.Queue(queue_size)
+
+    async def read_and_encrypt(src):
+        offset = 0
+        while True:
+            frames = await loop.run_in_executor(None, src.readframes, chunk_frames)
+            if not frames:
+                break
+            await encrypted.put(loop.run_in_executor(executor, cipher.encrypt_ctr, frames, nonce, offset))
+            offset += len(frames)
+        await encrypted.put(None)
+
+    async def hash_and_write(writer):
+        while True:
+            future = await encrypted.get()
+            if future is None:
+                break
+            chunk = await future
+            leaf = await loop.run_in_executor(executor, MerkleTree.leaf_hash, chunk)
+            await loop.run_in_executor(None, writer.write_chunk, chunk, leaf)
+
+    writer = None
+    try:
+        with wave.open(wave_path, 'rb') as src, open(path, 'wb') as dst:
+            writer = ContainerWriter(dst, src.getparams(), len(blowfish_key), signature_size, chunk_frames)
+            stages = [asyncio.ensure_future(read_and_encrypt(src)), asyncio.ensure_future(hash_and_write(writer))]
+            try:
+                await asyncio.gather(*stages)
+            finally:
+                # If one stage failed the other may be blocked on the queue:
+                # stop both and wait for them while the files are still open
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+                while not encrypted.empty():
+                    future = encrypted.get_nowait()
+                    if future is not None:
+                        _discard(future)
+            [(ephemeral_public_key, (wrapped_key, wrapped_nonce))] = await wrap
+            message = writer.signing_message(ephemeral_public_key, wrapped_key, wrapped_nonce)
+            s, padding = await loop.run_in_executor(executor, rabin_private_key.sign, message)
+            writer.finish(ephemeral_public_key, wrapped_key, wrapped_nonce, s, padding)
+    except BaseException:
+        # Do not leave a partial container behind
+        if os.path.exists(path) and writer is not None:
+            os.remove(path)
+        raise
+    finally:
+        _discard(wrap)
+
+
+async def write_containers_async(jobs, recipient_public_key, rabin_private_key, ec, executor=None,
+                                 max_files=4, **kwargs):
+    """
+    Runs write_container_async for (path, wave_path) pairs, with up to
+    `max_files` files in flight at once. If one fails the others are
+    cancelled before the error is raised.
+    """
+    limit = asyncio.Semaphore(max_files)
+
+    async def run(path, wave_path):
+        async with limit:
+            await write_container_async(path, wave_path, recipient_public_key, rabin_private_key, ec,
+                                        executor=executor, **kwargs)
+
+    tasks = [asyncio.ensure_future(run(path, wave_path)) for path, wave_path in jobs]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def write_container_concurrent(*args, **kwargs):
+    """
+    Blocking wrapper around write_container_async.
+    """
+    asyncio.run(write_container_async(*args, **kwargs))
@@ -0,0 +1,99 @@
+"""
+WAV file I/O, sample conversion and playback helpers.
+
+NumPy and sounddevice are only imported by the functions that need them, so
+reading, writing and encrypting files works without either being loaded.
+"""
+import wave
+
+from . import instrument
+
+# NumPy sample dtypes by PCM sample width (8-bit WAV samples are unsigned)
+SAMPLE_DTYPES = {1: 'u1', 2: '<i2', 4: '<i4'}
+
+# Function to read audio data from a .wav file
+def read_wave_file(file_path):
+    with instrument.stage('wave.read') as stage, wave.open(file_path, 'rb') as wf:
+        params = wf.getparams()
+        frames = wf.readframes(params.nframes)
+        stage.add_bytes(len(frames))
+        return params, frames
+
+# Function to write audio data to a .wav file
+def write_wave_file(file_path, params, frames):
+    with instrument.stage('wave.write', len(frames)), wave.open(file_path, 'wb') as wf:
+        wf.setparams(params)
+        wf.writeframes(frames)
+
+# Function to convert audio frames to a (frames, channels) numpy array
+def frames_to_array(frames, params):
+    with instrument.stage('frames_to_array', len(frames)):
+        return _frames_to_array(frames, params)
+
+def _frames_to_array(frames, params):
+    import numpy as np
+
+    num_channels = params.nchannels
+    sample_width = params.sampwidth
+
+    if sample_width == 3:
+        # 24-bit samples have no NumPy dtype: load each one into the top three
+        # bytes of an int32 and shift it back down to sign-extend it
+        samples = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        audio_data = np.zeros((len(samples), 4), dtype=np.uint8)
+        audio_data[:, 1:] = samples
+        audio_data = audio_data.view('<i4').reshape(-1) >> 8
+    elif sample_width in SAMPLE_DTYPES:
+        # Zero-copy view over the frame buffer
+        audio_data = np.frombuffer(frames, dtype=SAMPLE_DTYPES[sample_width])
+    else:
+        raise ValueError(f"unsupported sample width: {sample_width}")
+
+    return audio_data.reshape(-1, num_channels), params.framerate, num_channels
+
+# Function to convert a numpy array to audio frames. The result is a flat
+# memoryview of bytes for every sample width (accepted wherever bytes-like
+# objects are, e.g. writeframes); use bytes() on it where a bytes object is
+# needed, e.g. for concatenation
+def array_to_frames(audio_data, params):
+    import numpy as np
+
+    sample_width = params.sampwidth
+
+    if sample_width == 3:
+        samples = np.ascontiguousarray(audio_data, dtype='<i4').reshape(-1, 1)
+        return memoryview(np.ascontiguousarray(samples.view(np.uint8)[:, :3])).cast('B')
+    if sample_width not in SAMPLE_DTYPES:
+        raise ValueError(f"unsupported sample width: {sample_width}")
+
+    # Byte view over the samples; only copies if the dtype or layout differs
+    samples = np.ascontiguousarray(audio_data, dtype=SAMPLE_DTYPES[sample_width])
+    return memoryview(samples).cast('B')
+
+# Function to play audio data
+def play_audio(audio_data, frame_rate):
+    import sounddevice as sd
+
+    sd.play(audio_data, samplerate=frame_rate)
+    sd.wait()
+
+# Number of frames read, encrypted and written per chunk by the streaming pipeline
+CHUNK_FRAMES = 1 << 16
+
+# Function to encrypt a .wav file chunk by chunk with bounded memory
+def encrypt_wave_file(input_path, output_path, blowfish, iv, chunk_frames=CHUNK_FRAMES):
+    with wave.open(input_path, 'rb') as src, wave.open(output_path, 'wb') as dst:
+        dst.setparams(src.getparams())
+        stream = blowfish.ofb_stream(iv)
+        while True:
+            with instrument.stage('wave.read', 0) as stage:
+                frames = src.readframes(chunk_frames)
+                stage.add_bytes(len(frames))
+            if not frames:
+                break
+            with instrument.stage('wave.write', len(frames)):
+                dst.writeframesraw(stream.process(frames))
+
+# Function to decrypt a .wav file chunk by chunk (OFB decryption is encryption)
+def decrypt_wave_file(input_path, output_path, blowfish, iv, chunk_frames=CHUNK_FRAMES):
+    encrypt_wave_file(input_path, output_path, blowfish, iv, chunk_frames)
@@ -0,0 +1,200 @@
+"""
+Non-interactive batch encryption of WAV files into signed containers.
+
+    python -m audio_crypto.batch keygen KEY_DIR
+    python -m audio_crypto.batch encrypt --recipient-key KEY_DIR/recipient.pub.json \\
+        --signing-key KEY_DIR/signer.json --output-dir OUT (DIR | --manifest FILE)
+
+Files are processed across a process pool whose workers set up the
+EC-ElGamal tables and Rabin key once and reuse them for every file. Each
+container is written to a temporary name and renamed when complete, so an
+interrupted run can simply be started again: finished outputs are skipped.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .ElGamal import ECElGamal
+from .container import write_container
+from .rabin_sig import RabinSignature, RabinPrivateKey
+
+OUTPUT_SUFFIX = '.caud'
+
+# Per-worker state set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(recipient_public_key, signing_key):
+    ec = ECElGamal()
+    ec.fixed_base_table()
+    ec.wnaf_precompute(recipient_public_key)
+    _worker['ec'] = ec
+    _worker['recipient_public_key'] = recipient_public_key
+    _worker['rabin_private_key'] = RabinPrivateKey(*signing_key)
+
+
+def _encrypt_file(source, destination):
+    start = time.perf_counter()
+    tmp_path = f'{destination}.tmp{os.getpid()}'
+    try:
+        write_container(tmp_path, source, _worker['recipient_public_key'], _worker['rabin_private_key'], _worker['ec'])
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return os.path.getsize(source), time.perf_counter() - start
+
+
+def find_inputs(directory=None, manifest=None):
+    """
+    Returns (source, relative name) pairs in a stable order, from either every
+    .wav file under `directory` or the paths listed in a manifest file (one per
+    line, relative to the manifest's directory). Manifest entries that are
+    absolute or leave the manifest's directory raise ValueError, since their
+    names also place the outputs.
+    """
+    if manifest is not None:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest) as f:
+            names = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        inputs = []
+        for name in names:
+            relative = os.path.normpath(name)
+            if os.path.isabs(relative) or relative.split(os.sep)[0] == os.pardir:
+                raise ValueError(f'manifest entry is not a relative path inside {base}: {name}')
+            inputs.append((os.path.join(base, relative), relative))
+        return sorted(inputs)
+    inputs = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in files:
+            if name.lower().endswith('.wav'):
+                source = os.path.join(root, name)
+                inputs.append((source, os.path.relpath(source, directory)))
+    return sorted(inputs)
+
+
+def encrypt_batch(inputs, output_dir, recipient_public_key, signing_key, workers=None, log=print):
+    """
+    Encrypts (source, relative name) pairs into output_dir and returns a
+    report with one entry per file, sorted by name. A name whose output would
+    land outside output_dir raises ValueError before anything is written.
+    """
+    results = {}
+    jobs = []
+    root = os.path.realpath(output_dir)
+    destinations = []
+    for source, name in inputs:
+        destination = os.path.join(output_dir, name + OUTPUT_SUFFIX)
+        if os.path.commonpath([root, os.path.realpath(destination)]) != root:
+            raise ValueError(f'output for {name} would be written outside {output_dir}')
+        destinations.append((source, name, destination))
+    for source, name, destination in destinations:
+        if os.path.exists(destination):
+            results[name] = {'status': 'skipped', 'output': destination}
+        else:
+            os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+            jobs.append((source, name, destination))
+
+    started = time.perf_counter()
+    total_bytes = 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(recipient_public_key, signing_key)) as executor:
+        futures = {executor.submit(_encrypt_file, source, destination): (name, destination)
+                   for source, name, destination in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            name, destination = futures[future]
+            try:
+                size, seconds = future.result()
+            except Exception as error:
+                results[name] = {'status': 'failed', 'error': repr(error)}
+                log(f'[{done}/{len(jobs)}] {name}: FAILED {error!r}')
+                continue
+            total_bytes += size
+            rate = size / seconds / 1e6 if seconds else float('inf')
+            results[name] = {'status': 'encrypted', 'output': destination, 'bytes': size,
+                             'seconds': round(seconds, 3), 'mb_per_s': round(rate, 3)}
+            log(f'[{done}/{len(jobs)}] {name}: {size / 1e6:.1f} MB in {seconds:.2f} s ({rate:.2f} MB/s)')
+
+    elapsed = time.perf_counter() - started
+    if jobs:
+        log(f'{len(jobs)} files, {total_bytes / 1e6:.1f} MB in {elapsed:.2f} s '
+            f'({total_bytes / elapsed / 1e6:.2f} MB/s); {len(inputs) - len(jobs)} skipped')
+    return {name: results[name] for name in sorted(results)}
+
+
+def keygen(key_dir, rabin_bits=2048):
+    os.makedirs(key_dir, exist_ok=True)
+    ec = ECElGamal()
+    p, q = RabinSignature.generate_keys(rabin_bits)
+    files = {
+        'recipient.json': {'private_key': hex(ec.private_key), 'x': hex(ec.public_key[0]), 'y': hex(ec.public_key[1])},
+        'recipient.pub.json': {'x': hex(ec.public_key[0]), 'y': hex(ec.public_key[1])},
+        'signer.json': {'p': hex(p), 'q': hex(q)},
+        'signer.pub.json': {'n': hex(p * q)},
+    }
+    for name, content in files.items():
+        path = os.path.join(key_dir, name)
+        if name.endswith('.pub.json'):
+            f = open(path, 'w')
+        else:
+            # Private keys are created owner-only; fchmod also tightens a
+            # file left over from an earlier run before it is rewritten
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.fchmod(fd, 0o600)
+            f = os.fdopen(fd, 'w')
+        with f:
+            json.dump(content, f, indent=2)
+
+
+def _load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch-encrypt WAV files into signed audio containers.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    keygen_parser = commands.add_parser('keygen', help='generate recipient and signing key files')
+    keygen_parser.add_argument('key_dir')
+    keygen_parser.add_argument('--rabin-bits', type=int, default=2048)
+
+    encrypt_parser = commands.add_parser('encrypt', help='encrypt, sign and wrap keys for many files')
+    source = encrypt_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('input_dir', nargs='?')
+    source.add_argument('--manifest')
+    encrypt_parser.add_argument('--output-dir', required=True)
+    encrypt_parser.add_argument('--recipient-key', required=True, help='recipient public key (JSON with x, y)')
+    encrypt_parser.add_argument('--signing-key', required=True, help='Rabin private key (JSON with p, q)')
+    encrypt_parser.add_argument('--workers', type=int, default=None)
+    encrypt_parser.add_argument('--report', help='write the per-file report as JSON to this path')
+
+    args = parser.parse_args(argv)
+    if args.command == 'keygen':
+        keygen(args.key_dir, args.rabin_bits)
+        return 0
+
+    recipient = _load_json(args.recipient_key)
+    signer = _load_json(args.signing_key)
+    try:
+        report = encrypt_batch(
+            find_inputs(args.input_dir, args.manifest),
+            args.output_dir,
+            (int(recipient['x'], 16), int(recipient['y'], 16)),
+            (int(signer['p'], 16), int(signer['q'], 16)),
+            args.workers,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 1 if any(entry['status'] == 'failed' for entry in report.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
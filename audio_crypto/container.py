@@ -0,0 +1,249 @@
+"""
+On-disk container for encrypted audio.
+
+Layout (all integers big-endian):
+
+    header      magic b'CAUD', version, key length, nchannels, sampwidth,
+                framerate, nframes, frames per chunk, chunk count
+    key         EC-ElGamal ephemeral public key (x || y, 64 bytes), wrapped
+                Blowfish key and wrapped 8-byte CTR nonce
+    signature   Rabin padding, signature length and signature over the Merkle
+                root and chunk count (see merkle.sign_chunks) followed by the
+                SHA-256 of the header and key sections, so the audio
+                parameters and wrapped key are authenticated too
+    index       SHA-256 leaf hash of every ciphertext chunk
+    ciphertext  audio frames encrypted with Blowfish in CTR mode
+
+CTR mode makes every byte of the ciphertext independently decryptable, so a
+ContainerReader can mmap the file and decrypt any time range in place.
+"""
+import hashlib
+import mmap
+import os
+import wave
+from collections import namedtuple
+from struct import Struct
+
+from .blowfish import BlowFish
+from .merkle import MerkleTree
+from .rabin_sig import RabinSignature
+
+MAGIC = b'CAUD'
+VERSION = 2
+CHUNK_FRAMES = 1 << 14  # Frames per signed chunk
+
+HEADER = Struct('>4sBBHHIQIQ')
+SIGNATURE_HEADER = Struct('>IH')
+POINT_SIZE = 64
+NONCE_SIZE = 8
+HASH_SIZE = 32
+
+# Same fields as the params returned by wave's getparams(), so either can be
+# passed to setparams() or StreamingPlayer
+WaveParams = namedtuple('WaveParams', 'nchannels sampwidth framerate nframes comptype compname')
+
+
+def _key_section(ephemeral_public_key, wrapped_key, wrapped_nonce):
+    return (ephemeral_public_key[0].to_bytes(32, 'big') + ephemeral_public_key[1].to_bytes(32, 'big')
+            + wrapped_key + wrapped_nonce)
+
+
+def _signing_message(tree, header, key_section):
+    return tree.signing_message() + hashlib.sha256(bytes(header) + bytes(key_section)).digest()
+
+
+class ContainerWriter:
+    """
+    Writes a container to an open binary file in three steps: the header on
+    construction, then ciphertext chunks in order with write_chunk, then the
+    wrapped key material, signature and index with finish. Space for the
+    latter is reserved up front, so they can be produced after (or
+    concurrently with) the ciphertext.
+    """
+
+    def __init__(self, f, params, key_size, signature_size, chunk_frames=CHUNK_FRAMES):
+        self.f = f
+        self.signature_size = signature_size
+        self.chunk_count = -(-params.nframes // chunk_frames)
+        self.leaves = []
+        self.header = HEADER.pack(
+            MAGIC, VERSION, key_size,
+            params.nchannels, params.sampwidth, params.framerate, params.nframes,
+            chunk_frames, self.chunk_count
+        )
+        f.write(self.header)
+        self.key_offset = f.tell()
+        f.seek(POINT_SIZE + key_size + NONCE_SIZE + SIGNATURE_HEADER.size + signature_size
+               + self.chunk_count * HASH_SIZE, os.SEEK_CUR)
+
+    def write_chunk(self, chunk, leaf=None):
+        # `leaf` may be passed in if the chunk was already hashed elsewhere
+        self.leaves.append(MerkleTree.leaf_hash(chunk) if leaf is None else leaf)
+        self.f.write(chunk)
+
+    def tree(self):
+        if len(self.leaves) != self.chunk_count:
+            raise ValueError(f'expected {self.chunk_count} chunks, got {len(self.leaves)}')
+        return MerkleTree(self.leaves)
+
+    def signing_message(self, ephemeral_public_key, wrapped_key, wrapped_nonce):
+        # What the Rabin key signs: the chunk tree plus the header and key
+        # sections, once every chunk has been written
+        return _signing_message(self.tree(), self.header,
+                                _key_section(ephemeral_public_key, wrapped_key, wrapped_nonce))
+
+    def finish(self, ephemeral_public_key, wrapped_key, wrapped_nonce, s, padding):
+        f = self.f
+        f.seek(self.key_offset)
+        f.write(_key_section(ephemeral_public_key, wrapped_key, wrapped_nonce))
+        f.write(SIGNATURE_HEADER.pack(padding, self.signature_size))
+        f.write(s.to_bytes(self.signature_size, 'big'))
+        f.write(b''.join(self.leaves))
+        f.seek(0, os.SEEK_END)
+
+
+def write_container(path, wave_path, recipient_public_key, rabin_private_key, ec,
+                    blowfish_key=None, chunk_frames=CHUNK_FRAMES):
+    """
+    Encrypts a .wav file into a container at `path`, reading and writing one
+    chunk at a time. The Blowfish key (random if not given) and CTR nonce are
+    wrapped for `recipient_public_key` with `ec`, and the chunks are signed
+    with `rabin_private_key`.
+    """
+    if blowfish_key is None:
+        blowfish_key = os.urandom(16)
+    nonce = os.urandom(NONCE_SIZE)
+    cipher = BlowFish(blowfish_key)
+    [(ephemeral_public_key, (wrapped_key, wrapped_nonce))] = ec.encrypt_many(
+        [(recipient_public_key, [blowfish_key, nonce])]
+    )
+    signature_size = (rabin_private_key.n.bit_length() + 7) // 8
+
+    with wave.open(wave_path, 'rb') as src, open(path, 'wb') as dst:
+        writer = ContainerWriter(dst, src.getparams(), len(blowfish_key), signature_size, chunk_frames)
+        offset = 0
+        while True:
+            frames = src.readframes(chunk_frames)
+            if not frames:
+                break
+            writer.write_chunk(cipher.encrypt_ctr(frames, nonce, offset))
+            offset += len(frames)
+        s, padding = rabin_private_key.sign(
+            writer.signing_message(ephemeral_public_key, wrapped_key, wrapped_nonce)
+        )
+        writer.finish(ephemeral_public_key, wrapped_key, wrapped_nonce, s, padding)
+
+
+class ContainerReader:
+    """
+    Read-only, memory-mapped view of a container. Nothing beyond the header is
+    copied out of the file until it is asked for.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._buffer = memoryview(self._mmap)
+        try:
+            (magic, version, key_size, nchannels, sampwidth, framerate, nframes,
+             self.chunk_frames, self.chunk_count) = HEADER.unpack_from(buffer)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'not a version {VERSION} audio container')
+            if self.chunk_count != -(-nframes // self.chunk_frames):
+                raise ValueError('chunk count does not match the frame count')
+            self.params = WaveParams(nchannels, sampwidth, framerate, nframes, 'NONE', 'not compressed')
+            self.frame_size = nchannels * sampwidth
+
+            offset = HEADER.size
+            self.ephemeral_public_key = (
+                int.from_bytes(buffer[offset:offset + 32], 'big'),
+                int.from_bytes(buffer[offset + 32:offset + POINT_SIZE], 'big'),
+            )
+            offset += POINT_SIZE
+            self.wrapped_key = bytes(buffer[offset:offset + key_size])
+            offset += key_size
+            self.wrapped_nonce = bytes(buffer[offset:offset + NONCE_SIZE])
+            offset += NONCE_SIZE
+            self.header = bytes(buffer[:HEADER.size])
+            self.key_section = bytes(buffer[HEADER.size:offset])
+
+            self.padding, signature_size = SIGNATURE_HEADER.unpack_from(buffer, offset)
+            offset += SIGNATURE_HEADER.size
+            self.signature = int.from_bytes(buffer[offset:offset + signature_size], 'big')
+            offset += signature_size
+
+            self.index = buffer[offset:offset + self.chunk_count * HASH_SIZE]
+            offset += self.chunk_count * HASH_SIZE
+            self.ciphertext = buffer[offset:offset + nframes * self.frame_size]
+            if len(self.ciphertext) != nframes * self.frame_size:
+                raise ValueError('container is truncated')
+        except Exception:
+            self.close()
+            raise
+        self._cipher = None
+        self._nonce = None
+
+    def close(self):
+        for view in ('ciphertext', 'index', '_buffer'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def unwrap(self, ec, recipient_private_key):
+        """
+        Recovers the Blowfish key and nonce with the recipient's EC-ElGamal
+        private key; required before decrypting.
+        """
+        [(key, nonce)] = ec.decrypt_many(
+            recipient_private_key, [(self.ephemeral_public_key, [self.wrapped_key, self.wrapped_nonce])]
+        )
+        self._cipher = BlowFish(key)
+        self._nonce = nonce
+
+    def verify(self, n):
+        """
+        Checks the Rabin signature over the chunk index, header and wrapped
+        key. Individual chunks are then checked against the index with
+        verify_chunk; params and the chunk layout are only trustworthy once
+        this has returned True.
+        """
+        tree = MerkleTree(bytes(self.index[i:i + HASH_SIZE]) for i in range(0, len(self.index), HASH_SIZE))
+        message = _signing_message(tree, self.header, self.key_section)
+        return RabinSignature.verify(n, message, self.signature, self.padding)
+
+    def chunk(self, index):
+        chunk_size = self.chunk_frames * self.frame_size
+        return self.ciphertext[index * chunk_size:(index + 1) * chunk_size]
+
+    def verify_chunk(self, index):
+        leaf = self.index[index * HASH_SIZE:(index + 1) * HASH_SIZE]
+        return MerkleTree.leaf_hash(self.chunk(index)) == leaf
+
+    def decrypt_frames(self, start_frame, end_frame, verify=False):
+        """
+        Decrypts frames [start_frame, end_frame) straight from the mapped file.
+        With verify=True the chunks overlapping the range are checked against
+        the index first, raising ValueError on a mismatch.
+        """
+        if self._cipher is None:
+            raise ValueError('call unwrap() before decrypting')
+        start_frame = max(0, start_frame)
+        end_frame = min(end_frame, self.params.nframes)
+        if end_frame <= start_frame:
+            return b''
+        if verify:
+            for index in range(start_frame // self.chunk_frames, (end_frame - 1) // self.chunk_frames + 1):
+                if not self.verify_chunk(index):
+                    raise ValueError(f'chunk {index} does not match the signed index')
+        start, end = start_frame * self.frame_size, end_frame * self.frame_size
+        return self._cipher.decrypt_ctr(self.ciphertext[start:end], self._nonce, start)
+
+    def decrypt_time_range(self, start_seconds, end_seconds, verify=False):
+        framerate = self.params.framerate
+        return self.decrypt_frames(int(start_seconds * framerate), int(end_seconds * framerate), verify)
@@ -0,0 +1,195 @@
+"""
+Bob and Alice demo: Blowfish-OFB audio encryption, a Rabin-signed Merkle
+tree over the ciphertext and EC-ElGamal key wrapping.
+
+    python -m audio_crypto [--input input.wav] [--headless]
+
+With --headless (or AUDIO_CRYPTO_HEADLESS set) nothing is played and
+sounddevice is never imported; the decrypted audio is compared with the
+original instead. NumPy is still loaded by the bulk Blowfish modes.
+"""
+import argparse
+import os
+from os import urandom
+
+from . import instrument
+from .blowfish import BlowFish
+from .rabin_sig import RabinSignature, RabinPrivateKey
+from .ElGamal import ECElGamal
+from .merkle import iter_chunks, sign_chunks, verify_chunks
+from .streaming import StreamingPlayer
+from .audio import read_wave_file, frames_to_array, play_audio
+
+# Set to a file path to record a per-stage timing report and Chrome trace;
+# also set the second one to record peak allocations (much slower)
+TRACE_ENV = 'AUDIO_CRYPTO_TRACE'
+TRACE_MEMORY_ENV = 'AUDIO_CRYPTO_TRACE_MEMORY'
+
+# Set to run without audio output, e.g. on servers and in CI
+HEADLESS_ENV = 'AUDIO_CRYPTO_HEADLESS'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='audio_crypto', description='Bob and Alice secure audio demo.')
+    parser.add_argument('--input', default='input.wav', help='WAV file to send (default: input.wav)')
+    parser.add_argument('--headless', action='store_true', default=bool(os.environ.get(HEADLESS_ENV)),
+                        help='skip audio playback')
+    args = parser.parse_args(argv)
+
+    trace_path = os.environ.get(TRACE_ENV)
+    if trace_path:
+        instrument.enable(trace_memory=bool(os.environ.get(TRACE_MEMORY_ENV)))
+    try:
+        run_demo(args.input, args.headless)
+    finally:
+        if trace_path:
+            instrument.write_chrome_trace(trace_path)
+            print(instrument.format_report())
+            instrument.disable()
+
+# Function to decrypt and play verified chunks as they arrive
+def play_verified_chunks(verified_chunks, blowfish, iv, params):
+    # Playback starts once the first verified chunks are decrypted; the rest
+    # are verified and decrypted in the background while the audio plays.
+    # The keystream is generated ahead while playback waits on the device,
+    # so most chunks only need an XOR.
+    ofb_stream = blowfish.ofb_prefetch_stream(iv)
+    player = StreamingPlayer(verified_chunks, ofb_stream.process, params)
+    try:
+        player.play()
+        return player, ofb_stream.stats()
+    finally:
+        ofb_stream.close()
+
+def run_demo(input_file='input.wav', headless=False):
+    # Example usage
+    blowfish_key = b'secretkey'  # Blowfish key (must be between 4 and 56 bytes)
+
+    # Read the audio file
+    params, frames = read_wave_file(input_file)
+
+    print("="*50)
+    print("BOB AND ALICE SECURE COMMUNICATION")
+    print("="*50)
+
+    print("Bob wants to send the original audio to Alice in a secure way.")
+    print()
+
+    # Play the original audio
+    if not headless:
+        audio_data, frame_rate, num_channels = frames_to_array(frames, params)
+        print("Playing original audio...")
+        play_audio(audio_data, frame_rate)
+        print("[INFO] Original audio played.")
+        print()
+
+    print("="*50)
+    print("ENCRYPTION WITH BLOWFISH OFB MODE")
+    print("="*50)
+
+    print("Bob decides to encrypt the audio with the BlowFish algorithm.")
+    print(f"Bob chooses a secure key: {blowfish_key.decode()}")
+    print()
+
+    # Encrypt the audio data
+    blowfish = BlowFish(blowfish_key)
+    iv = urandom(8)  # Initialization vector
+    print(f"Bob uses BlowFish with OFB mode and generates a random initialization vector: {iv}")
+    data_encrypted = blowfish.encrypt_ofb_bulk(frames, iv)
+    print("[INFO] Audio encryption complete.")
+    print()
+
+    # Play the encrypted audio (this will be noise or garbage)
+    if not headless:
+        audio_data_encrypted, frame_rate, _ = frames_to_array(data_encrypted, params)
+        print("Playing encrypted audio...")
+        play_audio(audio_data_encrypted, frame_rate)
+        print("[INFO] Encrypted audio played.")
+        print()
+
+    print("="*50)
+    print("SIGNING WITH RABIN SIGNATURE")
+    print("="*50)
+
+    print("Now Bob decides to sign the message using the Rabin Signature Scheme.")
+    # RABIN
+    private_rabin_p, private_rabin_q = RabinSignature.generate_keys(1024)
+    print(f"Bob generates two private keys:\n  p: {private_rabin_p}\n  q: {private_rabin_q}")
+    public_rabin_key = private_rabin_p * private_rabin_q
+    print(f"With the private keys, Bob generates a public key:\n  public key = {public_rabin_key} = p * q")
+    print()
+
+    rabin_private_key = RabinPrivateKey(private_rabin_p, private_rabin_q)
+    with instrument.stage('rabin.sign_chunks', len(data_encrypted)):
+        merkle_tree, rabin_sign, padding = sign_chunks(rabin_private_key, iter_chunks(data_encrypted))
+    print(f"Bob splits the encrypted audio into {len(merkle_tree)} chunks, hashes them into a Merkle tree and signs its root:")
+    print(f"  Merkle root: {merkle_tree.root.hex()}\n  Signature: {rabin_sign}\n  Padding: {padding}")
+    print()
+
+    print("="*50)
+    print("ENCRYPTING BLOWFISH KEY AND IV WITH EC-ELGAMAL")
+    print("="*50)
+
+    # Bob encrypts the Blowfish key and IV using Alice's EC-ElGamal public key
+    bob_ec = ECElGamal()
+    alice_ec = ECElGamal()  # Assuming Alice's public key is known to Bob
+
+    # Encrypt the Blowfish key and IV under a single ephemeral key
+    [(ephemeral_public_key, (encrypted_blowfish_key, encrypted_iv))] = bob_ec.encrypt_many(
+        [(alice_ec.public_key, [blowfish_key, iv])]
+    )
+    print(f"Bob encrypts the Blowfish key and IV with Alice's EC-ElGamal public key.")
+    print(f"Encrypted Blowfish key: {encrypted_blowfish_key}")
+    print(f"Encrypted IV: {encrypted_iv}")
+    print()
+
+    print("="*50)
+    print("ALICE RECEIVES THE MESSAGE")
+    print("="*50)
+
+    # Alice decrypts the Blowfish key and IV using her private key
+    [(decrypted_blowfish_key, decrypted_iv)] = alice_ec.decrypt_many(
+        alice_ec.private_key, [(ephemeral_public_key, [encrypted_blowfish_key, encrypted_iv])]
+    )
+
+    print(f"Alice decrypts the Blowfish key: {decrypted_blowfish_key}")
+    print(f"Alice decrypts the IV: {decrypted_iv}")
+    print()
+
+    # Each chunk arrives with its Merkle proof and is decrypted as soon as it
+    # verifies, without waiting for the rest of the audio
+    received_chunks = (
+        (chunk, merkle_tree.proof(index)) for index, chunk in enumerate(iter_chunks(data_encrypted))
+    )
+    verified_chunks = verify_chunks(
+        public_rabin_key, merkle_tree.root, len(merkle_tree), rabin_sign, padding, received_chunks
+    )
+
+    alice_blowfish = BlowFish(decrypted_blowfish_key)
+    try:
+        if headless:
+            print("Decrypting audio as it is verified...")
+            ofb_stream = alice_blowfish.ofb_stream(decrypted_iv)
+            with instrument.stage('verify_decrypt', len(data_encrypted)):
+                data_decrypted = b"".join(ofb_stream.process(chunk) for chunk in verified_chunks)
+        else:
+            print("Playing decrypted audio as it is verified...")
+            with instrument.stage('verify_decrypt_play', len(data_encrypted)):
+                player, keystream_stats = play_verified_chunks(verified_chunks, alice_blowfish, decrypted_iv, params)
+    except ValueError as error:
+        print(f"Invalid signature! The sender is not authorized. ({error})")
+    else:
+        print("Valid signature! The sender is authorized.")
+        if headless:
+            print(f"[INFO] Decrypted audio matches the original: {data_decrypted == frames}.")
+        else:
+            print(f"[INFO] Decrypted audio played ({player.underruns} underruns).")
+            print(f"[INFO] Pregenerated keystream covered {keystream_stats['hit_bytes']} bytes, "
+                  f"{keystream_stats['miss_bytes']} bytes were generated on demand.")
+
+    print("="*50)
+    print("END OF SECURE COMMUNICATION")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
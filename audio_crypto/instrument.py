@@ -0,0 +1,260 @@
+"""
+Opt-in timing, throughput and memory instrumentation.
+
+Disabled by default. While disabled, stage() returns a shared no-op context
+manager and the primitives run unmodified, so the cost is one function call
+per stage in the demo and nothing at all inside the primitives. enable()
+wraps the primitives listed in PRIMITIVES and starts recording:
+
+    instrument.enable(trace_memory=True)
+    ...
+    print(instrument.format_report())
+    instrument.write_chrome_trace('trace.json')   # chrome://tracing, Perfetto
+
+Each stage records wall time, bytes processed, call count and, with
+trace_memory, the peak traced allocation (tracemalloc) above the level at
+which the stage started.
+"""
+import functools
+import importlib
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+def _len_arg(index):
+    # Bytes processed by a primitive taken as len() of one of its arguments
+    def nbytes(args, kwargs):
+        try:
+            return len(args[index])
+        except (IndexError, TypeError):
+            return 0
+    return nbytes
+
+
+def _no_bytes(args, kwargs):
+    return 0
+
+
+# (module in this package, class, method, bytes processed) for every
+# instrumented primitive.
+# Argument indexes include self for regular methods.
+PRIMITIVES = [
+    ('blowfish', 'BlowFish', '__init__', _no_bytes),
+    ('blowfish', 'BlowFish', 'encrypt_ofb_bulk', _len_arg(1)),
+    ('blowfish', 'BlowFish', 'encrypt_ctr', _len_arg(1)),
+    ('blowfish', 'OFBStream', 'process', _len_arg(1)),
+    ('blowfish', 'OFBPrefetchStream', 'process', _len_arg(1)),
+    ('ElGamal', 'ECElGamal', 'point_multiply', _no_bytes),
+    ('ElGamal', 'ECElGamal', 'base_multiply', _no_bytes),
+    ('ElGamal', 'ECElGamal', 'point_multiply_wnaf', _no_bytes),
+    ('ElGamal', 'ECElGamal', 'encrypt', _len_arg(2)),
+    ('ElGamal', 'ECElGamal', 'decrypt', _len_arg(3)),
+    ('ElGamal', 'ECElGamal', 'encrypt_many', _no_bytes),
+    ('ElGamal', 'ECElGamal', 'decrypt_many', _no_bytes),
+    ('rabin_sig', 'RabinSignature', 'generate_keys', _no_bytes),
+    ('rabin_sig', 'RabinSignature', 'message_hasher', _len_arg(0)),
+    ('rabin_sig', 'RabinSignature', 'verify', _len_arg(1)),
+    ('rabin_sig', 'RabinPrivateKey', 'sign', _len_arg(1)),
+]
+
+
+class _Stats:
+    __slots__ = ('calls', 'seconds', 'bytes', 'peak_bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.peak_bytes = 0
+
+
+_enabled = False
+_trace_memory = False
+_stats = {}
+_events = []
+_patched = []
+_lock = threading.Lock()
+_local = threading.local()
+_epoch = time.perf_counter()
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_bytes(self, nbytes):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, nbytes):
+        self.name = name
+        self.nbytes = nbytes
+        self.peak = 0
+
+    def add_bytes(self, nbytes):
+        self.nbytes += nbytes
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault('stack', [])
+        if _trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak so far to the enclosing stage before resetting it
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak - stack[-1].base)
+            tracemalloc.reset_peak()
+            self.base = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        stack = _local.stack
+        stack.pop()
+        if _trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak - self.base)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak + self.base - stack[-1].base)
+        with _lock:
+            stats = _stats.get(self.name)
+            if stats is None:
+                stats = _stats[self.name] = _Stats()
+            stats.calls += 1
+            stats.seconds += end - self.start
+            stats.bytes += self.nbytes
+            stats.peak_bytes = max(stats.peak_bytes, self.peak)
+            _events.append({
+                'name': self.name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                'ts': (self.start - _epoch) * 1e6, 'dur': (end - self.start) * 1e6,
+                'args': {'bytes': self.nbytes, 'peak_bytes': self.peak},
+            })
+        return False
+
+
+def stage(name, nbytes=0):
+    """
+    Context manager recording one run of the stage `name` over `nbytes` bytes
+    (more can be added with .add_bytes() inside the block).
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, nbytes)
+
+
+def _wrap(name, func, nbytes):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _Stage(name, nbytes(args, kwargs)):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _patch():
+    for module_name, class_name, method_name, nbytes in PRIMITIVES:
+        cls = getattr(importlib.import_module(f'.{module_name}', __package__), class_name)
+        original = inspect.getattr_static(cls, method_name)
+        name = f'{class_name}.{method_name}'
+        if isinstance(original, staticmethod):
+            replacement = staticmethod(_wrap(name, original.__func__, nbytes))
+        elif isinstance(original, classmethod):
+            replacement = classmethod(_wrap(name, original.__func__, nbytes))
+        else:
+            replacement = _wrap(name, original, nbytes)
+        setattr(cls, method_name, replacement)
+        _patched.append((cls, method_name, original))
+
+
+def _unpatch():
+    while _patched:
+        cls, method_name, original = _patched.pop()
+        setattr(cls, method_name, original)
+
+
+def enable(trace_memory=False):
+    """
+    Starts recording, wrapping the primitives. trace_memory also starts
+    tracemalloc, which slows allocation-heavy code down considerably.
+    """
+    global _enabled, _trace_memory
+    if _enabled:
+        return
+    _patch()
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable():
+    global _enabled, _trace_memory
+    if not _enabled:
+        return
+    _enabled = False
+    _unpatch()
+    if _trace_memory:
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+
+def report():
+    """
+    Per-stage totals: calls, seconds, bytes, MB/s and peak allocation.
+    """
+    with _lock:
+        return {
+            name: {
+                'calls': stats.calls,
+                'seconds': stats.seconds,
+                'bytes': stats.bytes,
+                'mb_per_s': stats.bytes / stats.seconds / 1e6 if stats.seconds and stats.bytes else None,
+                'peak_bytes': stats.peak_bytes if _trace_memory or stats.peak_bytes else None,
+            }
+            for name, stats in sorted(_stats.items(), key=lambda item: -item[1].seconds)
+        }
+
+
+def format_report():
+    lines = [f"{'stage':<32} {'calls':>7} {'seconds':>10} {'MB':>9} {'MB/s':>9} {'peak MB':>9}"]
+    for name, entry in report().items():
+        rate = f"{entry['mb_per_s']:9.2f}" if entry['mb_per_s'] else f"{'':>9}"
+        peak = f"{entry['peak_bytes'] / 1e6:9.2f}" if entry['peak_bytes'] is not None else f"{'':>9}"
+        lines.append(f"{name:<32} {entry['calls']:>7} {entry['seconds']:>10.4f} {entry['bytes'] / 1e6:>9.2f} {rate} {peak}")
+    return '\n'.join(lines)
+
+
+def write_report(path):
+    with open(path, 'w') as f:
+        json.dump(report(), f, indent=2)
+
+
+def write_chrome_trace(path):
+    """
+    Writes every recorded stage run in the Trace Event format understood by
+    chrome://tracing and Perfetto.
+    """
+    with _lock:
+        events = list(_events)
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,127 @@
+import hashlib
+
+from .rabin_sig import RabinSignature
+
+CHUNK_SIZE = 1 << 16  # Default bytes per chunk
+
+
+def iter_chunks(data, chunk_size: int = CHUNK_SIZE):
+    """
+    Splits bytes-like data or a binary file object into fixed-size chunks.
+    """
+    if hasattr(data, 'read'):
+        yield from iter(lambda: data.read(chunk_size), b'')
+        return
+    data = memoryview(data).cast('B')
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+class MerkleTree:
+    """
+    Merkle tree over the hashes of a sequence of chunks. An odd node at the
+    end of a level is promoted to the next level unchanged. A tree over no
+    chunks has a count of 0 and the hash of an empty leaf as its root.
+    """
+    LEAF_PREFIX = b'\x00'  # Domain separation between leaves and inner nodes
+    NODE_PREFIX = b'\x01'
+
+    def __init__(self, leaves):
+        leaves = list(leaves)
+        self.count = len(leaves)
+        self.levels = [leaves or [self.leaf_hash(b'')]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [self.node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @staticmethod
+    def leaf_hash(chunk) -> bytes:
+        hasher = hashlib.sha256(MerkleTree.LEAF_PREFIX)
+        hasher.update(chunk)
+        return hasher.digest()
+
+    @staticmethod
+    def node_hash(left: bytes, right: bytes) -> bytes:
+        return hashlib.sha256(MerkleTree.NODE_PREFIX + left + right).digest()
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        return cls(cls.leaf_hash(chunk) for chunk in chunks)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def signing_message(self) -> bytes:
+        """
+        The message that gets signed: the root followed by the leaf count, so
+        that a verifier also notices chunks missing from the end.
+        """
+        return self.root + len(self).to_bytes(8, 'big')
+
+    def proof(self, index: int) -> list:
+        """
+        Sibling hashes on the path from leaf `index` to the root.
+        """
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(level[sibling])
+            index //= 2
+        return path
+
+    @staticmethod
+    def verify_proof(root: bytes, count: int, index: int, chunk, proof: list) -> bool:
+        """
+        Checks that `chunk` is leaf `index` of the `count`-leaf tree with the
+        given root.
+        """
+        if not 0 <= index < count:
+            return False
+        node = MerkleTree.leaf_hash(chunk)
+        proof = iter(proof)
+        size = count
+        while size > 1:
+            if index % 2:
+                node = MerkleTree.node_hash(next(proof, b''), node)
+            elif index + 1 < size:
+                node = MerkleTree.node_hash(node, next(proof, b''))
+            index //= 2
+            size = (size + 1) // 2
+        return node == root and next(proof, None) is None
+
+
+def sign_chunks(private_key, chunks):
+    """
+    Hashes chunks into a Merkle tree and signs only its root with the Rabin
+    private key. Returns the tree, the signature and the padding used.
+    """
+    tree = MerkleTree.from_chunks(chunks)
+    s, padding = private_key.sign(tree.signing_message())
+    return tree, s, padding
+
+
+def verify_chunks(n: int, root: bytes, count: int, s: int, padding: int, chunks):
+    """
+    Yields the chunks of (chunk, proof) pairs one by one as each is verified
+    against the signed root, so that consumers can start on the first chunk
+    before the rest arrive. Raises ValueError if the signature or a chunk is
+    invalid, or if chunks are missing.
+    """
+    if not RabinSignature.verify(n, root + count.to_bytes(8, 'big'), s, padding):
+        raise ValueError('invalid signature on the Merkle root')
+    index = 0
+    for chunk, proof in chunks:
+        if not MerkleTree.verify_proof(root, count, index, chunk, proof):
+            raise ValueError(f'chunk {index} does not match the signed Merkle root')
+        yield chunk
+        index += 1
+    if index != count:
+        raise ValueError(f'expected {count} chunks, got {index}')
@@ -0,0 +1,255 @@
+import random
+import secrets
+import hashlib
+import math
+
+class RabinSignature:
+    SECURITY_LEVEL = 1  # Bit length for public key and hash
+    SMALL_PRIMES = tuple(n for n in range(3, 2048, 2) if all(n % d for d in range(3, int(math.sqrt(n)) + 1, 2)))
+    SIEVE_WINDOW = 4096  # Candidates sieved at once when searching for a prime
+    HASH_CHUNK_SIZE = 1 << 20  # Bytes read at a time when hashing file objects
+
+    @staticmethod
+    def is_prime(number):
+        """
+        Checks if a number is prime.
+        """
+        if number % 2 == 0 and number > 2:
+            return False
+        return all(number % i != 0 for i in range(3, int(math.sqrt(number)) + 1, 2))
+
+    @staticmethod
+    def miller_rabin_rounds(bits: int) -> int:
+        """
+        Miller-Rabin rounds for an error probability below 2^-100 on random
+        candidates of the given size (FIPS 186-4, table C.2).
+        """
+        if bits >= 1536:
+            return 3
+        if bits >= 1024:
+            return 4
+        if bits >= 512:
+            return 7
+        return 40
+
+    @staticmethod
+    def is_probable_prime(number: int, rounds: int = None) -> bool:
+        """
+        Miller-Rabin probabilistic primality test.
+        """
+        if number < 2:
+            return False
+        for prime in (2,) + RabinSignature.SMALL_PRIMES[:32]:
+            if number % prime == 0:
+                return number == prime
+        if rounds is None:
+            rounds = RabinSignature.miller_rabin_rounds(number.bit_length())
+        d, r = number - 1, 0
+        while d % 2 == 0:
+            d //= 2
+            r += 1
+        for _ in range(rounds):
+            x = pow(2 + secrets.randbelow(number - 3), d, number)
+            if x == 1 or x == number - 1:
+                continue
+            for _ in range(r - 1):
+                x = x * x % number
+                if x == number - 1:
+                    break
+            else:
+                return False
+        return True
+
+    @staticmethod
+    def generate_prime(bits: int) -> int:
+        """
+        Generates a random prime of exactly `bits` bits that is congruent to
+        3 mod 4. Candidates are sieved by small primes a window at a time and
+        only the survivors are tested with Miller-Rabin.
+        """
+        if bits < 16:
+            raise ValueError("prime size must be at least 16 bits")
+        window = RabinSignature.SIEVE_WINDOW
+        # Top two bits set so that the product of two such primes has exactly
+        # 2 * bits bits
+        start = secrets.randbits(bits) | (3 << (bits - 2)) | 3
+        while True:
+            # sieve[i] stays 1 while start + 4 * i has no small factor
+            sieve = bytearray(b'\x01') * window
+            for prime in RabinSignature.SMALL_PRIMES:
+                first = -start * pow(4, -1, prime) % prime
+                sieve[first::prime] = bytes(len(range(first, window, prime)))
+            for i in (i for i, survivor in enumerate(sieve) if survivor):
+                candidate = start + 4 * i
+                if candidate.bit_length() != bits:
+                    break
+                if RabinSignature.is_probable_prime(candidate):
+                    return candidate
+            else:
+                start += 4 * window
+                continue
+            # Ran past the top of the range: start again from a fresh point
+            start = secrets.randbits(bits) | (3 << (bits - 2)) | 3
+
+    @staticmethod
+    def hash512(x: bytes) -> bytes:
+        hx = hashlib.sha256(x).digest()
+        idx = len(hx) // 2
+        return hashlib.sha256(hx[:idx]).digest() + hashlib.sha256(hx[idx:]).digest()
+
+    @staticmethod
+    def hash_to_int(x: bytes) -> int:
+        """Converts hash output to an integer."""
+        hx = RabinSignature.hash512(x)
+        for i in range(RabinSignature.SECURITY_LEVEL - 1):
+            hx += RabinSignature.hash512(hx)
+        return int.from_bytes(hx, 'little')
+
+    @staticmethod
+    def message_hasher(message):
+        """
+        Hashes a message in a single pass and returns the SHA-256 object.
+        The message may be bytes-like, a binary file object or an iterable of
+        bytes-like chunks.
+        """
+        hasher = hashlib.sha256()
+        if hasattr(message, 'read'):
+            for chunk in iter(lambda: message.read(RabinSignature.HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+            return hasher
+        try:
+            hasher.update(message)
+        except TypeError:
+            for chunk in message:
+                hasher.update(chunk)
+        return hasher
+
+    @staticmethod
+    def padded_hash_to_int(hasher, padding: int) -> int:
+        """
+        Same as hash_to_int(message + b'\\x00' * padding), where `hasher` is
+        the message_hasher of the message. Only the padding is hashed here.
+        """
+        state = hasher.copy()
+        state.update(b'\x00' * padding)
+        hx = state.digest()
+        idx = len(hx) // 2
+        hx = hashlib.sha256(hx[:idx]).digest() + hashlib.sha256(hx[idx:]).digest()
+        for i in range(RabinSignature.SECURITY_LEVEL - 1):
+            hx += RabinSignature.hash512(hx)
+        return int.from_bytes(hx, 'little')
+
+    @staticmethod
+    def generate_keys(bits: int = None):
+        # Generate p and q, both congruent to 3 mod 4. Without `bits` these are
+        # toy-sized primes below 400; otherwise n = p * q has `bits` bits.
+        if bits is not None:
+            while True:
+                p = RabinSignature.generate_prime(bits // 2)
+                q = RabinSignature.generate_prime(bits - bits // 2)
+                if p != q:
+                    return p, q
+        while True:
+            p = 3 + 4 * random.randint(1, 100)
+            q = 3 + 4 * random.randint(1, 100)
+            if RabinSignature.is_prime(p) and RabinSignature.is_prime(q) and p != q:
+                return p, q
+
+    @staticmethod
+    def generate_keys_many(count: int, bits: int, workers: int = None) -> list:
+        """
+        Generates `count` key pairs with `bits`-bit moduli, searching for all
+        the primes in parallel across a process pool.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        sizes = [bits // 2, bits - bits // 2] * count
+        with ProcessPoolExecutor(workers) as executor:
+            primes = list(executor.map(RabinSignature.generate_prime, sizes))
+        keys = []
+        for p, q in zip(primes[0::2], primes[1::2]):
+            while p == q:
+                q = RabinSignature.generate_prime(bits - bits // 2)
+            keys.append((p, q))
+        return keys
+
+    @staticmethod
+    def sign_rabin(p: int, q: int, message: bytes) -> tuple:
+        return RabinPrivateKey(p, q).sign(message)
+
+    @staticmethod
+    def verify(n: int, message: bytes, s: int, padding: int) -> bool:
+        hasher = RabinSignature.message_hasher(message)
+        h = RabinSignature.padded_hash_to_int(hasher, padding) % n
+        return h == (s * s) % n
+
+    @staticmethod
+    def main():
+        # Generate keys
+        p, q = RabinSignature.generate_keys()
+        n = p * q
+
+        print(f"Public key (n): {n}")
+        print(f"Private key (p, q): ({p}, {q})")
+
+        # Message to be signed
+        message = b"Hello, this is a test message!"
+
+        # Sign the message
+        s, padding = RabinSignature.sign_rabin(p, q, message)
+        print(f"Signature: {s}")
+        print(f"Padding used: {padding}")
+
+        # Verify the signature
+        is_valid = RabinSignature.verify(n, message, s, padding)
+        print(f"Signature valid: {is_valid}")
+
+class RabinPrivateKey:
+    """
+    Rabin private key (p, q) with everything signing needs besides the
+    per-message exponentiations precomputed once.
+    """
+    __slots__ = ('p', 'q', 'n', 'p_exponent', 'q_exponent', 'p_coefficient', 'q_coefficient')
+
+    def __init__(self, p: int, q: int):
+        self.p = p
+        self.q = q
+        self.n = n = p * q
+        # Square roots modulo primes congruent to 3 mod 4
+        self.p_exponent = (p + 1) // 4
+        self.q_exponent = (q + 1) // 4
+        # CRT recombination coefficients q * (q^-1 mod p) and p * (p^-1 mod q)
+        self.p_coefficient = q * pow(q, p - 2, p) % n
+        self.q_coefficient = p * pow(p, q - 2, q) % n
+
+    def sign(self, message: bytes) -> tuple:
+        """
+        Signs a message, returning the signature and the padding used. The
+        message is read once and may be anything RabinSignature.message_hasher
+        accepts.
+        """
+        p, q, n = self.p, self.q, self.n
+        hasher = RabinSignature.message_hasher(message)
+        i = 0
+        while True:
+            h = RabinSignature.padded_hash_to_int(hasher, i) % n
+            # The square root candidates double as the residuosity test: h is
+            # a square mod p (or 0) exactly when root_p^2 == h mod p
+            root_p = pow(h, self.p_exponent, p)
+            if root_p * root_p % p == h % p:
+                root_q = pow(h, self.q_exponent, q)
+                if root_q * root_q % q == h % q:
+                    break
+            i += 1
+        s = (self.p_coefficient * root_p + self.q_coefficient * root_q) % n
+        return s, i
+
+    def sign_many(self, messages) -> list:
+        """
+        Signs each message in turn, returning (signature, padding) pairs.
+        """
+        return [self.sign(message) for message in messages]
+
+
+if __name__ == "__main__":
+    RabinSignature.main()
@@ -0,0 +1,233 @@
+"""
+Just-in-time decryption for real-time playback.
+
+A background thread decrypts ciphertext chunks into a ring buffer while the
+audio device's callback drains it, so playback starts as soon as the first
+chunks are ready instead of after the whole file has been decrypted.
+"""
+import threading
+import time
+
+
+class RingBuffer:
+    """
+    Fixed-capacity byte FIFO shared by one writer and one reader thread.
+    Writes block while the buffer is full; reads never block.
+    """
+
+    def __init__(self, capacity):
+        self._data = bytearray(capacity)
+        self._capacity = capacity
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        while len(data):
+            with self._cond:
+                while self._size == self._capacity and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                end = (self._start + self._size) % self._capacity
+                count = min(len(data), self._capacity - self._size, self._capacity - end)
+                self._data[end:end + count] = data[:count]
+                self._size += count
+                self._cond.notify_all()
+            data = data[count:]
+
+    def read_into(self, out):
+        # Copies up to len(out) bytes into `out` and returns how many it copied
+        out = memoryview(out).cast('B')
+        with self._cond:
+            count = min(len(out), self._size)
+            first = min(count, self._capacity - self._start)
+            out[:first] = self._data[self._start:self._start + first]
+            out[first:count] = self._data[:count - first]
+            self._start = (self._start + count) % self._capacity
+            self._size -= count
+            self._cond.notify_all()
+        return count
+
+    def wait_for(self, size, timeout=None):
+        # Blocks until at least `size` bytes are buffered or the buffer is closed
+        with self._cond:
+            return self._cond.wait_for(lambda: self._size >= size or self._closed, timeout)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class NullOutputStream:
+    """
+    Stand-in for sounddevice.RawOutputStream that pulls audio through the
+    callback without any audio hardware, e.g. in CI. `speed` scales the
+    playback clock (2.0 plays twice as fast as the sample rate); None runs
+    the callback as fast as possible.
+    """
+
+    def __init__(self, samplerate, channels, dtype, blocksize, callback, sampwidth, speed=1.0, capture=False):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.block_bytes = blocksize * channels * sampwidth
+        self.speed = speed
+        self.captured = bytearray() if capture else None
+        self.frames_played = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        period = self.blocksize / self.samplerate / (self.speed or 1.0)
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            out = bytearray(self.block_bytes)
+            self.callback(out, self.blocksize, None, None)
+            self.frames_played += self.blocksize
+            if self.captured is not None:
+                self.captured += out
+            if self.speed is not None:
+                deadline += period
+                self._stop.wait(max(0.0, deadline - time.monotonic()))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+
+# sounddevice dtypes by sample width; 24-bit is only supported by raw streams
+SOUNDDEVICE_DTYPES = {1: 'uint8', 2: 'int16', 3: 'int24', 4: 'int32'}
+
+
+def sounddevice_stream(samplerate, channels, dtype, blocksize, callback, sampwidth):
+    import sounddevice as sd
+
+    return sd.RawOutputStream(samplerate=samplerate, channels=channels, dtype=dtype,
+                              blocksize=blocksize, callback=callback)
+
+
+class StreamingPlayer:
+    """
+    Plays decrypted audio while it is being decrypted.
+
+    `chunks` is an iterable of ciphertext chunks and `decrypt` turns each one
+    into plaintext frames (e.g. OFBStream.process). `latency` is the budget in
+    seconds: playback starts once that much audio is buffered, and the ring
+    buffer holds twice as much. Underruns are filled with silence and counted.
+    `stream_factory` defaults to a sounddevice raw output stream; pass a
+    NullOutputStream factory to run without audio hardware.
+    """
+
+    def __init__(self, chunks, decrypt, params, latency=0.2, blocksize=1024, stream_factory=sounddevice_stream):
+        self.params = params
+        self.latency = latency
+        self.blocksize = blocksize
+        self.frame_size = params.nchannels * params.sampwidth
+        self.silence = b'\x80' if params.sampwidth == 1 else b'\x00'
+        self.stream_factory = stream_factory
+
+        budget_bytes = max(1, int(latency * params.framerate)) * self.frame_size
+        self.prefill_bytes = budget_bytes
+        self.ring = RingBuffer(2 * max(budget_bytes, blocksize * self.frame_size))
+
+        self.underruns = 0
+        self.underrun_frames = 0
+        self.frames_played = 0
+        self.error = None
+
+        self._chunks = chunks
+        self._decrypt = decrypt
+        self._producer_done = threading.Event()
+        self._finished = threading.Event()
+        self._producer = threading.Thread(target=self._produce, daemon=True)
+
+    def _produce(self):
+        try:
+            for chunk in self._chunks:
+                # play() closes the ring when it stops early; do not go on
+                # decrypting (and verifying) chunks nobody will play
+                if self.ring.closed:
+                    break
+                self.ring.write(self._decrypt(chunk))
+        except BaseException as error:
+            self.error = error
+        finally:
+            self._producer_done.set()
+            self.ring.close()
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = memoryview(outdata).cast('B')
+        # Chunks need not end on a frame boundary. Only whole frames are
+        # taken until the producer is done, so silence padding an underrun
+        # never splits a frame and shifts everything after it.
+        available = len(self.ring)
+        if not self._producer_done.is_set():
+            available -= available % self.frame_size
+        count = self.ring.read_into(out[:min(len(out), available)])
+        self.frames_played += count // self.frame_size
+        if count < len(out):
+            out[count:] = self.silence * (len(out) - count)
+            if self._producer_done.is_set() and not len(self.ring):
+                self._finished.set()
+            else:
+                self.underruns += 1
+                self.underrun_frames += (len(out) - count) // self.frame_size
+
+    def play(self):
+        """
+        Decrypts and plays until the chunks run out. Re-raises any error from
+        the chunk source or the decryption.
+        """
+        self._producer.start()
+        try:
+            self.ring.wait_for(self.prefill_bytes)
+            if self.error is None:
+                stream = self.stream_factory(
+                    self.params.framerate, self.params.nchannels, SOUNDDEVICE_DTYPES[self.params.sampwidth],
+                    self.blocksize, self._callback, self.params.sampwidth
+                )
+                try:
+                    stream.start()
+                    while not self._finished.wait(0.05):
+                        if self.error is not None:
+                            break
+                finally:
+                    stream.stop()
+                    stream.close()
+        finally:
+            # Also reached when the stream cannot be opened or started, so
+            # the producer is never left blocked on a full ring buffer
+            self.ring.close()
+            self._producer.join()
+        if self.error is not None:
+            raise self.error
+
+    def stats(self):
+        return {
+            'latency_budget': self.latency,
+            'frames_played': self.frames_played,
+            'underruns': self.underruns,
+            'underrun_frames': self.underrun_frames,
+        }
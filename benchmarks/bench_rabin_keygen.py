@@ -0,0 +1,45 @@
+"""
+Rabin key generation time per modulus size.
+
+Usage: python benchmarks/bench_rabin_keygen.py [--sizes 1024 2048 ...] [--repeat N] [--workers N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_crypto.rabin_sig import RabinSignature
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[512, 1024, 2048, 3072, 4096])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='also time generate_keys_many with this many processes')
+    args = parser.parse_args()
+
+    print(f"{'bits':>6} {'median s':>10} {'min s':>10} {'max s':>10}")
+    for bits in args.sizes:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            RabinSignature.generate_keys(bits)
+            times.append(time.perf_counter() - start)
+        print(f"{bits:>6} {statistics.median(times):>10.3f} {min(times):>10.3f} {max(times):>10.3f}")
+
+    if args.workers:
+        print()
+        print(f"generate_keys_many({args.repeat} keys, {args.workers} workers)")
+        for bits in args.sizes:
+            start = time.perf_counter()
+            RabinSignature.generate_keys_many(args.repeat, bits, args.workers)
+            elapsed = time.perf_counter() - start
+            print(f"{bits:>6} {elapsed / args.repeat:>10.3f} s/key")
+
+
+if __name__ == '__main__':
+    main()
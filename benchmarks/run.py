@@ -0,0 +1,269 @@
+"""
+Benchmark suite for every primitive, the full WAV pipeline and cold start.
+
+Usage:
+    python benchmarks/run.py [--sizes 65536 1048576] [--repeat 5] [--output results.json]
+    python benchmarks/run.py --compare baseline.json [--threshold 0.1]
+
+Each benchmark is timed `repeat` times and the median is reported as a
+throughput (higher is better). With --compare, results are checked against a
+previous JSON file and the run fails if anything is slower by more than the
+threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from audio_crypto.blowfish import BlowFish
+from audio_crypto.ElGamal import ECElGamal
+from audio_crypto.merkle import iter_chunks, sign_chunks, verify_chunks
+from audio_crypto.rabin_sig import RabinSignature, RabinPrivateKey
+
+FRAMERATE = 44100
+
+
+def write_synthetic_wav(path, size, channels=2, sampwidth=2, framerate=FRAMERATE):
+    """
+    Writes a WAV file of about `size` bytes of audio: a 440 Hz tone with a
+    deterministic noise floor, so runs are reproducible.
+    """
+    import numpy as np
+
+    frames = max(1, size // (channels * sampwidth))
+    t = np.arange(frames) / framerate
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    noise = np.random.default_rng(0).normal(0, 0.05, (frames, channels))
+    scale = (1 << (8 * sampwidth - 1)) - 1
+    samples = ((tone[:, None] + noise).clip(-1, 1) * scale).astype(f'<i{sampwidth}')
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sampwidth)
+        wf.setframerate(framerate)
+        wf.writeframes(samples.tobytes())
+
+
+def measure(func, repeat, number=1):
+    # Median and best time per call over `repeat` runs of `number` calls,
+    # after one untimed call that absorbs lazy imports and cache fills
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return statistics.median(times), min(times)
+
+
+def result(name, seconds, best, work, unit):
+    return {'name': name, 'unit': unit, 'value': work / seconds, 'best': work / best, 'seconds': seconds}
+
+
+def bench_blowfish(sizes, repeat):
+    key = b'benchmark key'
+    seconds, best = measure(lambda: BlowFish(key, cache=False), repeat)
+    yield result('blowfish.key_expansion', seconds, best, 1, 'ops/s')
+    seconds, best = measure(lambda: BlowFish(key), repeat, 100)
+    yield result('blowfish.key_expansion_cached', seconds, best, 1, 'ops/s')
+
+    cipher = BlowFish(key)
+    iv = bytes(8)
+    for size in sizes:
+        data = os.urandom(size)
+        seconds, best = measure(lambda: b''.join(cipher.encrypt_ofb(data, iv)), repeat)
+        yield result(f'blowfish.encrypt_ofb[{size}]', seconds, best, size / 1e6, 'MB/s')
+        seconds, best = measure(lambda: cipher.encrypt_ofb_bulk(data, iv), repeat)
+        yield result(f'blowfish.encrypt_ofb_bulk[{size}]', seconds, best, size / 1e6, 'MB/s')
+        seconds, best = measure(lambda: cipher.encrypt_ctr(data, iv), repeat)
+        yield result(f'blowfish.encrypt_ctr[{size}]', seconds, best, size / 1e6, 'MB/s')
+        block_data = data[:size - size % 8]
+        seconds, best = measure(lambda: cipher.encrypt_ecb(block_data), repeat)
+        yield result(f'blowfish.encrypt_ecb[{size}]', seconds, best, size / 1e6, 'MB/s')
+        ciphertext = cipher.encrypt_cbc(block_data, iv)
+        seconds, best = measure(lambda: cipher.decrypt_cbc(ciphertext, iv), repeat)
+        yield result(f'blowfish.decrypt_cbc[{size}]', seconds, best, size / 1e6, 'MB/s')
+
+
+def bench_elgamal(sizes, repeat):
+    ec = ECElGamal()
+    recipient = ECElGamal()
+    scalar = int.from_bytes(os.urandom(32), 'big') % ec.N
+    message = os.urandom(16)
+    ephemeral_public_key, ciphertext = ec.encrypt(recipient.public_key, message)
+
+    seconds, best = measure(lambda: ec.point_multiply(scalar, recipient.public_key), repeat, 10)
+    yield result('elgamal.point_multiply', seconds, best, 1, 'ops/s')
+    seconds, best = measure(lambda: ec.point_multiply_wnaf(scalar, recipient.public_key), repeat, 10)
+    yield result('elgamal.point_multiply_glv', seconds, best, 1, 'ops/s')
+    seconds, best = measure(lambda: ec.base_multiply(scalar), repeat, 10)
+    yield result('elgamal.base_multiply', seconds, best, 1, 'ops/s')
+    seconds, best = measure(lambda: ec.encrypt(recipient.public_key, message), repeat, 10)
+    yield result('elgamal.encrypt', seconds, best, 1, 'ops/s')
+    seconds, best = measure(lambda: recipient.decrypt(recipient.private_key, ephemeral_public_key, ciphertext), repeat, 10)
+    yield result('elgamal.decrypt', seconds, best, 1, 'ops/s')
+    batch = [(recipient.public_key, message)] * 32
+    seconds, best = measure(lambda: ec.encrypt_many(batch), repeat)
+    yield result('elgamal.encrypt_many[32]', seconds, best, len(batch), 'ops/s')
+    for size in sizes:
+        payload = os.urandom(size)
+        seconds, best = measure(lambda: ec.encrypt(recipient.public_key, payload), repeat)
+        yield result(f'elgamal.encrypt_payload[{size}]', seconds, best, size / 1e6, 'MB/s')
+
+
+def bench_rabin(sizes, repeat, bits=1024):
+    seconds, best = measure(lambda: RabinSignature.generate_keys(bits), repeat)
+    yield result(f'rabin.generate_keys[{bits}]', seconds, best, 1, 'ops/s')
+
+    p, q = RabinSignature.generate_keys(bits)
+    private_key = RabinPrivateKey(p, q)
+    for size in sizes:
+        message = os.urandom(size)
+        s, padding = private_key.sign(message)
+        seconds, best = measure(lambda: RabinSignature.sign_rabin(p, q, message), repeat)
+        yield result(f'rabin.sign_rabin[{size}]', seconds, best, size / 1e6, 'MB/s')
+        seconds, best = measure(lambda: RabinSignature.verify(p * q, message, s, padding), repeat)
+        yield result(f'rabin.verify[{size}]', seconds, best, size / 1e6, 'MB/s')
+
+
+def run_pipeline(path, bob_ec, alice_ec, rabin_key):
+    # The main.py flow without playback: read, encrypt, sign, wrap, unwrap,
+    # verify and decrypt
+    with wave.open(path, 'rb') as wf:
+        frames = wf.readframes(wf.getnframes())
+    key, iv = os.urandom(16), os.urandom(8)
+    data_encrypted = BlowFish(key).encrypt_ofb_bulk(frames, iv)
+    tree, s, padding = sign_chunks(rabin_key, iter_chunks(data_encrypted))
+    [(ephemeral_public_key, wrapped)] = bob_ec.encrypt_many([(alice_ec.public_key, [key, iv])])
+
+    [(key, iv)] = alice_ec.decrypt_many(alice_ec.private_key, [(ephemeral_public_key, wrapped)])
+    chunks = ((chunk, tree.proof(i)) for i, chunk in enumerate(iter_chunks(data_encrypted)))
+    stream = BlowFish(key).ofb_stream(iv)
+    decrypted = b''.join(stream.process(chunk) for chunk in verify_chunks(rabin_key.n, tree.root, len(tree), s, padding, chunks))
+    if decrypted != frames:
+        raise AssertionError('pipeline round trip failed')
+
+
+def bench_pipeline(sizes, repeat, bits=1024):
+    bob_ec, alice_ec = ECElGamal(), ECElGamal()
+    rabin_key = RabinPrivateKey(*RabinSignature.generate_keys(bits))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f'{size}.wav')
+            write_synthetic_wav(path, size)
+            seconds, best = measure(lambda: run_pipeline(path, bob_ec, alice_ec, rabin_key), repeat)
+            yield result(f'pipeline.wav_round_trip[{size}]', seconds, best, size / 1e6, 'MB/s')
+
+
+# (name, statement, modules it must not load) timed in a fresh interpreter.
+# The headless demo encrypts with the NumPy-backed Blowfish modes, so only
+# sounddevice is off limits there.
+NO_HEAVY_IMPORTS = ('numpy', 'sounddevice')
+STARTUP_STATEMENTS = [
+    ('python', 'pass', NO_HEAVY_IMPORTS),
+    ('import_package', 'import audio_crypto', NO_HEAVY_IMPORTS),
+    ('import_primitives', 'from audio_crypto import BlowFish, ECElGamal, RabinSignature, MerkleTree',
+     NO_HEAVY_IMPORTS),
+    ('import_demo', 'import audio_crypto.demo', NO_HEAVY_IMPORTS),
+    ('first_cipher', 'from audio_crypto import BlowFish; BlowFish(b"benchmark key")', NO_HEAVY_IMPORTS),
+    ('demo_headless', 'from audio_crypto.demo import main; main(["--headless"])', ('sounddevice',)),
+]
+
+
+def run_startup(statement, forbidden):
+    # Exit status 3 flags a forbidden import, anything else nonzero a failure
+    code = f'{statement}\nimport sys\nsys.exit(3 if set({list(forbidden)!r}) & set(sys.modules) else 0)'
+    returncode = subprocess.run([sys.executable, '-c', code], cwd=ROOT, stdout=subprocess.DEVNULL).returncode
+    if returncode == 3:
+        raise AssertionError(f'{statement!r} imported one of {", ".join(forbidden)}')
+    if returncode:
+        raise AssertionError(f'{statement!r} failed with exit status {returncode}')
+
+
+def bench_startup(sizes, repeat):
+    # Cold start: wall time of a new interpreter running each statement
+    for name, statement, forbidden in STARTUP_STATEMENTS:
+        seconds, best = measure(lambda: run_startup(statement, forbidden), repeat)
+        yield result(f'startup.{name}', seconds, best, 1, 'starts/s')
+
+
+BENCHMARKS = {
+    'blowfish': bench_blowfish,
+    'elgamal': bench_elgamal,
+    'rabin': bench_rabin,
+    'pipeline': bench_pipeline,
+    'startup': bench_startup,
+}
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change of every benchmark against a baseline and returns the
+    names of those that got slower by more than `threshold`.
+    """
+    previous = {entry['name']: entry for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        old = previous.get(entry['name'])
+        if old is None:
+            continue
+        change = entry['value'] / old['value'] - 1
+        flag = ''
+        if change < -threshold:
+            regressions.append(entry['name'])
+            flag = '  REGRESSION'
+        print(f"{entry['name']:<40} {old['value']:>12.3f} -> {entry['value']:>12.3f} {entry['unit']:<6} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1 << 16, 1 << 20], help='input sizes in bytes')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='run only these groups')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--compare', help='baseline JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown when comparing')
+    args = parser.parse_args(argv)
+
+    results = []
+    for group in args.only or BENCHMARKS:
+        for entry in BENCHMARKS[group](args.sizes, args.repeat):
+            results.append(entry)
+            print(f"{entry['name']:<40} {entry['value']:>12.3f} {entry['unit']}")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'sizes': args.sizes,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Plays audio through StreamingPlayer on a NullOutputStream, so no audio
+hardware is needed, and checks what comes out.
+
+Usage: python checks/check_streaming.py
+
+Each case feeds chunks that do not end on frame boundaries through a decrypt
+step slow enough to cause underruns. The captured output with its silent
+underrun frames removed must equal the input. A stream that fails to open
+must stop the producer. Exits with status 1 on any failure.
+"""
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_crypto.container import WaveParams
+from audio_crypto.streaming import NullOutputStream, StreamingPlayer
+
+# (nchannels, sampwidth, chunk size in bytes)
+CASES = [
+    (2, 3, 1000),   # 24-bit stereo, 6-byte frames
+    (1, 2, 999),
+    (2, 4, 1001),
+    (1, 1, 777),
+]
+
+
+def test_frames(nframes, frame_size, silence):
+    # Random audio without any silent frame, so inserted silence can be told
+    # apart from the signal
+    data = bytearray(os.urandom(nframes * frame_size))
+    for i in range(0, len(data), frame_size):
+        if data[i:i + frame_size] == silence * frame_size:
+            data[i] ^= 0xff
+    return bytes(data)
+
+
+def check_playback(nchannels, sampwidth, chunk_size, nframes=3000):
+    params = WaveParams(nchannels, sampwidth, 8000, nframes, 'NONE', 'not compressed')
+    frame_size = nchannels * sampwidth
+    silence = b'\x80' if sampwidth == 1 else b'\x00'
+    frames = test_frames(nframes, frame_size, silence)
+    chunks = [frames[i:i + chunk_size] for i in range(0, len(frames), chunk_size)]
+
+    def slow_decrypt(chunk, calls=itertools.count()):
+        if next(calls) % 4 == 3:
+            time.sleep(0.02)
+        return chunk
+
+    streams = []
+
+    def stream_factory(*args):
+        stream = NullOutputStream(*args, speed=4.0, capture=True)
+        streams.append(stream)
+        return stream
+
+    player = StreamingPlayer(iter(chunks), slow_decrypt, params, latency=0.01, blocksize=64,
+                             stream_factory=stream_factory)
+    player.play()
+
+    captured = bytes(streams[0].captured)
+    played = b''.join(
+        captured[i:i + frame_size] for i in range(0, len(captured), frame_size)
+        if captured[i:i + frame_size] != silence * frame_size
+    )
+    name = f'{nchannels}ch {8 * sampwidth}-bit, {chunk_size}-byte chunks'
+    failures = []
+    if played != frames:
+        failures.append('captured audio differs from the input')
+    if player.frames_played != nframes:
+        failures.append(f'frames_played is {player.frames_played}, expected {nframes}')
+    if not player.underruns:
+        failures.append('no underrun happened, so the case proves nothing')
+    print(f"{name:<36} {player.underruns:>4} underruns  {'FAIL: ' + '; '.join(failures) if failures else 'ok'}")
+    return not failures
+
+
+def check_stream_failure():
+    # An endless chunk source: play() only returns if the producer stops once
+    # the ring buffer is closed
+    params = WaveParams(1, 2, 8000, 0, 'NONE', 'not compressed')
+    decrypted = itertools.count()
+
+    def decrypt(chunk):
+        next(decrypted)
+        return chunk
+
+    def no_device(*args):
+        raise OSError('no output device')
+
+    player = StreamingPlayer(itertools.repeat(bytes(600)), decrypt, params, latency=0.01, stream_factory=no_device)
+    try:
+        player.play()
+    except OSError:
+        ok = not player._producer.is_alive()
+    else:
+        ok = False
+    print(f"{'stream fails to open':<36} {'ok' if ok else 'FAIL: producer kept running'}")
+    return ok
+
+
+def main():
+    results = [check_playback(*case) for case in CASES]
+    results.append(check_stream_failure())
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())